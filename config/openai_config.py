@@ -1,10 +1,12 @@
 """OpenAI configuration and client setup."""
 import os
-from typing import Optional
+from typing import Optional, TYPE_CHECKING
 
-from openai import OpenAI
 from dotenv import load_dotenv
 
+if TYPE_CHECKING:
+    from openai import OpenAI
+
 # Load environment variables
 load_dotenv()
 
@@ -17,7 +19,7 @@ class OpenAIConfig:
     TIMEOUT = 30.0
     
     @staticmethod
-    def get_client(api_key: Optional[str] = None) -> OpenAI:
+    def get_client(api_key: Optional[str] = None) -> 'OpenAI':
         """
         Get OpenAI client instance.
         
@@ -36,6 +38,9 @@ class OpenAIConfig:
         if not api_key:
             raise ValueError("OpenAI API key not found. Set OPENAI_API_KEY environment variable.")
             
+        # Imported here so that importing the config doesn't load the SDK
+        from openai import OpenAI
+        
         return OpenAI(
             api_key=api_key,
             timeout=OpenAIConfig.TIMEOUT,
@@ -43,6 +48,6 @@ class OpenAIConfig:
         )
 
 
-def get_openai_client() -> OpenAI:
+def get_openai_client() -> 'OpenAI':
     """Get the default OpenAI client instance."""
     return OpenAIConfig.get_client()
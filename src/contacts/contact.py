@@ -2,6 +2,7 @@
 Contact class for managing contact information and message history.
 """
 
+from functools import lru_cache
 from typing import Dict, List, Optional
 from datetime import datetime
 import json
@@ -12,6 +13,11 @@ from pathlib import Path
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Deletes every ASCII character except 0-9
+_STRIP_NON_DIGITS = str.maketrans('', '', ''.join(
+    chr(c) for c in range(128) if not chr(c).isdigit()
+))
+
 class Contact:
     """Represents a contact in the iMessage CRM system."""
     
@@ -170,10 +176,12 @@ class Contact:
         self.updated_at = datetime.now().isoformat()
         
     @staticmethod
+    @lru_cache(maxsize=4096)
     def _normalize_phone_number(phone: str) -> str:
         """
         Normalize a phone number to E.164 format.
         Assumes US numbers if no country code provided.
+        Results are cached, since the same numbers are matched repeatedly.
         """
         # Handle empty input
         if not phone:
@@ -183,8 +191,11 @@ class Contact:
         if phone.startswith('+') and len(phone) > 1:
             return phone
             
-        # Remove all non-digit characters
-        digits = ''.join(filter(str.isdigit, phone))
+        # Remove all non-digit characters (translate handles ASCII in C; the
+        # per-character filter is only needed for other scripts' characters)
+        digits = phone.translate(_STRIP_NON_DIGITS)
+        if not digits.isascii():
+            digits = ''.join(filter(str.isdigit, digits))
         
         # Handle different formats
         if len(digits) == 10:
@@ -2,16 +2,17 @@
 import logging
 import json
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
-
-from openai import OpenAI
-from openai.types.chat import ChatCompletion
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
 
 from src.database.contacts_db import ContactsDatabaseConnector
 from src.database.chat_state import ChatStateManager
 from src.messaging import MessageSender
 from config.openai_config import OpenAIConfig
 
+if TYPE_CHECKING:
+    from openai import OpenAI
+    from openai.types.chat import ChatCompletion
+
 logger = logging.getLogger(__name__)
 
 class ContactEnrichmentManager:
@@ -22,7 +23,7 @@ class ContactEnrichmentManager:
                  message_sender: MessageSender,
                  state_manager: ChatStateManager,
                  system_phone: str,
-                 openai_client: Optional[OpenAI] = None):
+                 openai_client: Optional['OpenAI'] = None):
         """
         Initialize contact enrichment manager.
         
@@ -116,7 +117,7 @@ class ContactEnrichmentManager:
             ]
             
             logger.debug(f"Sending request to OpenAI with context: {context}")
-            response: ChatCompletion = self.openai_client.chat.completions.create(
+            response: 'ChatCompletion' = self.openai_client.chat.completions.create(
                 model=OpenAIConfig.DEFAULT_MODEL,
                 messages=messages,
                 temperature=OpenAIConfig.DEFAULT_TEMPERATURE
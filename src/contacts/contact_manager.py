@@ -6,7 +6,7 @@ Handles storage, retrieval, and operations on Contact objects.
 import os
 import json
 import logging
-from typing import Dict, List, Optional, Union
+from typing import Any, Dict, Iterable, List, Optional, Union
 from datetime import datetime
 from pathlib import Path
 from .contact import Contact
@@ -39,6 +39,15 @@ class ContactManager:
             
         self.storage_dir = Path(storage_dir)
         self.contacts: Dict[str, Contact] = {}
+        
+        # Identifier key -> ID of the first contact with that identifier,
+        # built on first lookup; None means it must be rebuilt
+        self._identifier_index: Optional[Dict[str, str]] = None
+        # Contact ID -> identifier keys it was indexed under
+        self._indexed_keys: Dict[str, frozenset] = {}
+        # Contact ID -> number of phone numbers and emails when indexed
+        self._indexed_counts: Dict[str, int] = {}
+        
         self._ensure_storage_exists()
         self._load_contacts()
         
@@ -49,10 +58,13 @@ class ContactManager:
     def _load_contacts(self) -> None:
         """Load all contacts from storage."""
         logger.info(f"Loading contacts from {self.storage_dir}")
-        for file_path in self.storage_dir.glob("*.json"):
+        # List the directory once, then parse each file from a single read
+        with os.scandir(self.storage_dir) as entries:
+            file_paths = [entry.path for entry in entries if entry.name.endswith(".json")]
+        for file_path in file_paths:
             try:
-                with open(file_path, 'r') as f:
-                    data = json.load(f)
+                with open(file_path, 'rb') as f:
+                    data = json.loads(f.read())
                 contact = Contact.from_dict(data)
                 self.contacts[contact.contact_id] = contact
             except Exception as e:
@@ -83,9 +95,38 @@ class ContactManager:
             raise ContactManagerError(f"Contact {contact.contact_id} already exists")
             
         self.contacts[contact.contact_id] = contact
+        self._index_contact(contact)
         self._save_contact(contact)
         logger.info(f"Added contact: {contact.name} ({contact.contact_id})")
         
+    def add_contacts(self, contacts: List[Contact]) -> None:
+        """
+        Add several new contacts at once.
+        
+        Every contact is checked before anything is stored, so a duplicate
+        leaves the manager unchanged.
+        
+        Args:
+            contacts: Contacts to add
+            
+        Raises:
+            ContactManagerError: If any contact already exists or appears twice
+        """
+        seen = set()
+        duplicates = set()
+        for contact in contacts:
+            if contact.contact_id in self.contacts or contact.contact_id in seen:
+                duplicates.add(contact.contact_id)
+            seen.add(contact.contact_id)
+        if duplicates:
+            raise ContactManagerError(f"Contacts already exist: {', '.join(sorted(duplicates))}")
+            
+        for contact in contacts:
+            self.contacts[contact.contact_id] = contact
+            self._index_contact(contact)
+            self._save_contact(contact)
+        logger.info(f"Added {len(contacts)} contacts")
+        
     def update_contact(self, contact: Contact) -> None:
         """
         Update an existing contact.
@@ -100,6 +141,8 @@ class ContactManager:
             raise ContactNotFoundError(f"Contact {contact.contact_id} not found")
             
         self.contacts[contact.contact_id] = contact
+        if self._identifier_keys(contact) != self._indexed_keys.get(contact.contact_id):
+            self._identifier_index = None
         self._save_contact(contact)
         logger.info(f"Updated contact: {contact.name} ({contact.contact_id})")
         
@@ -134,6 +177,7 @@ class ContactManager:
             raise ContactNotFoundError(f"Contact {contact_id} not found")
             
         contact = self.contacts.pop(contact_id)
+        self._identifier_index = None
         file_path = self.storage_dir / f"{contact_id}.json"
         try:
             file_path.unlink()
@@ -144,20 +188,112 @@ class ContactManager:
             self.contacts[contact_id] = contact
             raise ContactManagerError(f"Failed to delete contact: {e}")
             
+    @staticmethod
+    def _identifier_key(identifier: str) -> str:
+        """
+        Get the key two identifiers share when matches_identifier equates them.
+        
+        Emails compare case-insensitively; phone numbers compare on their
+        normalized form without the leading '+1'.
+        """
+        if '@' in identifier:
+            return identifier.lower()
+        return Contact._normalize_phone_number(identifier).lstrip('+1')
+        
+    def _identifier_keys(self, contact: Contact) -> frozenset:
+        """Get every identifier key of a contact."""
+        return frozenset(
+            key for key in map(self._identifier_key, contact.phone_numbers + contact.emails)
+            if key
+        )
+        
+    def _index_contact(self, contact: Contact) -> None:
+        """Add a contact to the identifier index, if it has been built."""
+        if self._identifier_index is None:
+            return
+        keys = self._identifier_keys(contact)
+        self._indexed_keys[contact.contact_id] = keys
+        self._indexed_counts[contact.contact_id] = len(contact.phone_numbers) + len(contact.emails)
+        for key in keys:
+            # Earlier contacts win, as in a scan over self.contacts
+            self._identifier_index.setdefault(key, contact.contact_id)
+            
+    def _get_identifier_index(self) -> Dict[str, str]:
+        """Get the identifier index, rebuilding it if contacts changed."""
+        if self._identifier_index is None:
+            self._identifier_index = {}
+            self._indexed_keys = {}
+            self._indexed_counts = {}
+            for contact in self.contacts.values():
+                self._index_contact(contact)
+        return self._identifier_index
+        
+    def _identifiers_added(self) -> bool:
+        """Check whether any contact gained identifiers since it was indexed."""
+        return any(
+            len(contact.phone_numbers) + len(contact.emails)
+            != self._indexed_counts.get(contact_id)
+            for contact_id, contact in self.contacts.items()
+        )
+        
     def find_by_identifier(self, identifier: str) -> Optional[Contact]:
         """
         Find a contact by phone number or email.
         
+        Lookups go through an identifier index. Contacts edited in place
+        (e.g. with add_phone_number) are re-indexed when a lookup misses or
+        finds a contact that no longer matches.
+        
         Args:
             identifier: Phone number or email to search for
             
         Returns:
             Matching contact or None if not found
         """
-        for contact in self.contacts.values():
-            if contact.matches_identifier(identifier):
-                return contact
-        return None
+        return self.find_by_identifiers([identifier]).get(identifier)
+        
+    def get_contacts_bulk(self, phones: Iterable[str]) -> Dict[str, Contact]:
+        """
+        Find contacts for several phone numbers.
+        
+        Args:
+            phones: Phone numbers to look up, in any supported format
+            
+        Returns:
+            Dict mapping each phone number that has a contact to that contact.
+            Phone numbers without a contact are omitted.
+        """
+        return self.find_by_identifiers(phones)
+        
+    def find_by_identifiers(self, identifiers: Iterable[str]) -> Dict[str, Contact]:
+        """
+        Find contacts for several phone numbers or emails.
+        
+        Args:
+            identifiers: Phone numbers and/or emails to search for
+            
+        Returns:
+            Dict mapping each identifier that has a contact to that contact.
+            Identifiers without a contact are omitted.
+        """
+        results = {}
+        # Whether in-place edits were already ruled out for this call
+        checked = False
+        for identifier in identifiers:
+            key = self._identifier_key(identifier)
+            contact = self.contacts.get(self._get_identifier_index().get(key))
+            if contact is None:
+                stale = not checked and self._identifiers_added()
+                checked = True
+            else:
+                stale = not contact.matches_identifier(identifier)
+            if stale:
+                # A contact was edited in place since it was indexed
+                self._identifier_index = None
+                contact = self.contacts.get(self._get_identifier_index().get(key))
+            if contact is not None:
+                results[identifier] = contact
+        return results
         
     def search_contacts(
         self,
@@ -270,6 +406,43 @@ class ContactManager:
         )
         self._save_contact(contact)
         
+    def bulk_update_message_stats(self, updates: List[Dict[str, Any]]) -> None:
+        """
+        Update message statistics, and optionally metadata, for multiple contacts.
+        
+        Every identifier is resolved before anything changes, and each contact
+        is written to storage once however many updates touch it.
+        
+        Args:
+            updates: One dict per update with an 'identifier' (phone number or
+                email) and any of 'total_delta', 'unread_delta',
+                'last_message_time' and 'metadata' (dict of key-value pairs)
+                
+        Raises:
+            ContactNotFoundError: If any identifier has no contact
+        """
+        contacts = self.find_by_identifiers(update['identifier'] for update in updates)
+        missing = [update['identifier'] for update in updates if update['identifier'] not in contacts]
+        if missing:
+            raise ContactNotFoundError(f"No contact found for {', '.join(missing)}")
+            
+        changed = {}
+        for update in updates:
+            contact = contacts[update['identifier']]
+            contact.update_message_stats(
+                total_delta=update.get('total_delta', 0),
+                unread_delta=update.get('unread_delta', 0),
+                last_message_time=update.get('last_message_time')
+            )
+            for key, value in update.get('metadata', {}).items():
+                contact.set_metadata(key, value)
+            changed[contact.contact_id] = contact
+            
+        for contact in changed.values():
+            self._save_contact(contact)
+            
+        logger.info(f"Updated message stats for {len(changed)} contacts")
+        
     def _matches_query(self, contact: Contact, query: str) -> bool:
         """Check if a contact matches a search query."""
         query = query.lower()
@@ -2,6 +2,6 @@
 Database module for iMessage CRM.
 """
 
-from .db_connector import DatabaseConnector, DatabaseError, PermissionError
+from .db_connector import DatabaseConnector, DatabaseError, PermissionError, watch_chat_db
 
-__all__ = ['DatabaseConnector', 'DatabaseError', 'PermissionError']
+__all__ = ['DatabaseConnector', 'DatabaseError', 'PermissionError', 'watch_chat_db']
@@ -50,6 +50,12 @@ class ChatStateManager:
                     chat_guid TEXT REFERENCES group_chats(chat_guid),
                     processed_at TIMESTAMP NOT NULL
                 );
+
+                -- Track scan progress through chat.db (e.g. last scanned chat ROWID)
+                CREATE TABLE IF NOT EXISTS scan_state (
+                    key TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                );
             """)
 
     def is_chat_processed(self, chat_guid):
@@ -117,6 +123,23 @@ class ChatStateManager:
                 ) VALUES (?, ?, ?)
             """, (message_id, chat_guid, datetime.now().isoformat()))
             
+    def get_last_scanned_chat_rowid(self):
+        """Get the highest chat.db chat ROWID that no longer needs rescanning."""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.execute(
+                "SELECT value FROM scan_state WHERE key = 'last_scanned_chat_rowid'"
+            )
+            result = cursor.fetchone()
+            return result[0] if result else 0
+
+    def set_last_scanned_chat_rowid(self, rowid):
+        """Update the highest chat.db chat ROWID that no longer needs rescanning."""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO scan_state (key, value)
+                VALUES ('last_scanned_chat_rowid', ?)
+            """, (rowid,))
+            
     def reset_state(self):
         """Reset all state - useful for testing."""
         logger.info("Resetting chat state database...")
@@ -125,6 +148,7 @@ class ChatStateManager:
                 DELETE FROM processed_messages;
                 DELETE FROM participants;
                 DELETE FROM group_chats;
+                DELETE FROM scan_state;
             """)
         logger.info("Chat state database reset complete")
 
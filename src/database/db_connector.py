@@ -5,8 +5,10 @@ Handles connection management, permissions, and basic querying functionality.
 
 import os
 import sqlite3
+import threading
+import time
 from pathlib import Path
-from typing import Optional, List, Tuple, Dict
+from typing import Optional, List, Tuple, Dict, Union, Callable, Any, TypeVar
 import logging
 from contextlib import contextmanager
 
@@ -14,6 +16,8 @@ from contextlib import contextmanager
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+T = TypeVar('T')
+
 class DatabaseError(Exception):
     """Base exception for database-related errors."""
     pass
@@ -22,25 +26,136 @@ class PermissionError(DatabaseError):
     """Raised when database access is denied."""
     pass
 
+def watch_chat_db(
+    db_path: str,
+    event: threading.Event,
+    poll_interval: float = 0.05
+) -> threading.Event:
+    """
+    Watch chat.db for writes and set an event whenever it changes.
+    
+    Messages writes through SQLite's WAL, so both chat.db and chat.db-wal
+    are watched. Checking their mtime/size is a couple of stat calls per
+    interval, so callers can block on the event instead of sleeping and
+    re-querying the database.
+    
+    Args:
+        db_path: Path to chat.db
+        event: Event to set when the database changes
+        poll_interval: Seconds between checks
+        
+    Returns:
+        Stop event; set it to shut the watcher thread down
+    """
+    paths = [db_path, f"{db_path}-wal"]
+    stop = threading.Event()
+    
+    def snapshot() -> List[Optional[Tuple[int, int]]]:
+        stamps = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+                stamps.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                stamps.append(None)
+        return stamps
+        
+    def watch() -> None:
+        last = snapshot()
+        while not stop.wait(poll_interval):
+            current = snapshot()
+            if current != last:
+                last = current
+                event.set()
+                
+    threading.Thread(target=watch, name="chat-db-watcher", daemon=True).start()
+    return stop
+
 class DatabaseConnector:
     """Manages connections and queries to the iMessage chat.db database."""
     
     DEFAULT_DB_PATH = str(Path.home() / "Library" / "Messages" / "chat.db")
     
-    def __init__(self, db_path: Optional[str] = None):
+    # Per-connection tuning for a read-heavy workload. journal_mode is
+    # persistent and owned by Messages (chat.db already runs in WAL mode),
+    # so it is deliberately left alone. The 64 MB page cache (negative
+    # cache_size is in KiB) keeps hot B-tree pages on the long-lived
+    # per-thread connection instead of the 2 MB default.
+    CONNECTION_PRAGMAS = (
+        "PRAGMA synchronous=NORMAL",
+        "PRAGMA temp_store=MEMORY",
+        "PRAGMA mmap_size=268435456",
+        "PRAGMA cache_size=-65536",
+    )
+    
+    # Prepared statements kept per connection, keyed by SQL text
+    STATEMENT_CACHE_SIZE = 256
+    
+    # Connections idle longer than this (seconds) are pinged before reuse
+    PRE_PING_IDLE = 30.0
+    
+    # Queries hitting a transient lock/IO error are retried with backoff
+    MAX_QUERY_ATTEMPTS = 3
+    RETRY_BACKOFF = 0.05
+    TRANSIENT_ERRORS = ('locked', 'busy', 'disk i/o error', 'unable to open database')
+    
+    def __init__(
+        self,
+        db_path: Optional[Union[str, sqlite3.Connection]] = None,
+        row_factory: Optional[Callable[[sqlite3.Cursor, tuple], Any]] = sqlite3.Row
+    ):
         """
         Initialize the database connector.
         
         Args:
             db_path: Optional path to chat.db. If None, uses default location.
+                Also accepts an in-memory database (":memory:",
+                "file::memory:?cache=shared" or a "file:...?mode=memory" URI),
+                which is opened once, or an open sqlite3.Connection. Either is
+                then shared by all threads and left open by close().
+            row_factory: Row factory for the connections; None returns
+                plain tuples
         
         Raises:
             PermissionError: If database access is denied
             DatabaseError: If database cannot be accessed for other reasons
         """
+        self._local = threading.local()
+        self._shared_conn = None
+        self.row_factory = row_factory
+        if isinstance(db_path, sqlite3.Connection):
+            self.db_path = None
+            self._shared_conn = db_path
+            self._shared_conn.row_factory = row_factory
+            return
+            
         self.db_path = db_path or self.DEFAULT_DB_PATH
+        if self._is_memory_path(self.db_path):
+            # Each connection to a memory database would see an empty one, so
+            # every thread shares the single connection holding the data
+            self._shared_conn = self._connect(check_same_thread=False)
+            return
         self._validate_database_access()
         
+    @staticmethod
+    def _is_memory_path(db_path: str) -> bool:
+        """
+        Check whether a database path names an in-memory database.
+        
+        Args:
+            db_path: Database path or URI
+            
+        Returns:
+            True for ":memory:" and "file:" URIs naming :memory: or with
+            mode=memory
+        """
+        if db_path == ':memory:':
+            return True
+        if not db_path.startswith('file:'):
+            return False
+        path, _, query = db_path[len('file:'):].partition('?')
+        return path == ':memory:' or 'mode=memory' in query.split('&')
+        
     def _validate_database_access(self) -> None:
         """
         Validate that we can access the database.
@@ -63,11 +178,35 @@ class DatabaseConnector:
                 ) from e
             raise DatabaseError(f"Database error: {e}") from e
     
+    def _connect(self, check_same_thread: bool = True) -> sqlite3.Connection:
+        """
+        Open and configure a new connection to the database.
+        
+        Args:
+            check_same_thread: Restrict the connection to the opening thread
+            
+        Returns:
+            sqlite3.Connection: Configured database connection
+        """
+        conn = sqlite3.connect(
+            self.db_path,
+            cached_statements=self.STATEMENT_CACHE_SIZE,
+            uri=self.db_path.startswith('file:'),
+            check_same_thread=check_same_thread
+        )
+        conn.row_factory = self.row_factory
+        for pragma in self.CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+    
     @contextmanager
     def get_connection(self):
         """
         Context manager for database connections.
         
+        Each thread reuses one connection, so its prepared statement cache
+        survives across queries. The connection stays open until close().
+        
         Yields:
             sqlite3.Connection: Database connection
             
@@ -76,15 +215,49 @@ class DatabaseConnector:
         """
         conn = None
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row  # Enable dictionary-like row access
+            conn = self._thread_connection()
             yield conn
         except sqlite3.Error as e:
+            if conn is not None and conn.in_transaction:
+                conn.rollback()
             raise DatabaseError(f"Database connection error: {e}") from e
-        finally:
-            if conn:
-                conn.close()
                 
+    def _thread_connection(self) -> sqlite3.Connection:
+        """
+        Get the calling thread's connection, opening it if needed.
+        
+        A connection idle for longer than PRE_PING_IDLE is pinged first and
+        reopened if the ping fails (e.g. after chat.db was replaced).
+        
+        Returns:
+            sqlite3.Connection: Database connection
+        """
+        if self._shared_conn is not None:
+            return self._shared_conn
+        conn = getattr(self._local, 'conn', None)
+        now = time.monotonic()
+        if conn is not None and now - self._local.last_used > self.PRE_PING_IDLE:
+            try:
+                conn.execute("SELECT 1")
+            except sqlite3.Error as e:
+                logger.warning(f"Idle database connection failed pre-ping, reopening: {e}")
+                self.close()
+                conn = None
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        self._local.last_used = now
+        return conn
+    
+    def close(self) -> None:
+        """Close the calling thread's database connection, if one is open."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            self._local.conn = None
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                logger.warning(f"Error closing database connection: {e}")
+            
     def get_recent_messages(self, limit: int = 100) -> List[Dict]:
         """
         Get recent messages from the database.
@@ -176,6 +349,8 @@ class DatabaseConnector:
         """
         Execute a SQL query and return results.
         
+        Transient errors are retried as described in run_with_retry.
+        
         Args:
             query: SQL query string
             params: Query parameters
@@ -186,19 +361,66 @@ class DatabaseConnector:
         Raises:
             DatabaseError: If query execution fails
         """
-        try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(query, params)
-                # Handle both direct SELECT queries and CTEs (WITH ... SELECT)
-                query_upper = query.strip().upper()
-                if query_upper.startswith('SELECT') or query_upper.startswith('WITH'):
-                    return [dict(row) for row in cursor.fetchall()]
-                else:
-                    conn.commit()
-                    return [{'lastrowid': cursor.lastrowid}]
-        except sqlite3.Error as e:
-            raise DatabaseError(f"Error executing query: {e}") from e
+        def run(conn: sqlite3.Connection) -> List[Dict]:
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            # Handle both direct SELECT queries and CTEs (WITH ... SELECT)
+            query_upper = query.strip().upper()
+            if query_upper.startswith('SELECT') or query_upper.startswith('WITH'):
+                return [dict(row) for row in cursor.fetchall()]
+            else:
+                conn.commit()
+                return [{'lastrowid': cursor.lastrowid}]
+                
+        return self.run_with_retry(run)
+        
+    def run_with_retry(self, operation: Callable[[sqlite3.Connection], T]) -> T:
+        """
+        Run an operation on the calling thread's connection.
+        
+        Transient errors (database locked/busy, I/O errors while Messages
+        checkpoints or replaces chat.db) reopen the connection and retry
+        with exponential backoff, up to MAX_QUERY_ATTEMPTS attempts.
+        
+        Args:
+            operation: Called with the connection; its result is returned
+            
+        Returns:
+            The operation's result
+            
+        Raises:
+            DatabaseError: If the operation fails
+        """
+        for attempt in range(self.MAX_QUERY_ATTEMPTS):
+            try:
+                with self.get_connection() as conn:
+                    return operation(conn)
+            except DatabaseError as e:
+                cause = e.__cause__
+                if (
+                    not self._is_transient(cause)
+                    or attempt == self.MAX_QUERY_ATTEMPTS - 1
+                ):
+                    raise DatabaseError(f"Error executing query: {cause or e}") from cause
+                delay = self.RETRY_BACKOFF * 2 ** attempt
+                logger.warning(f"Transient database error, retrying in {delay:.2f}s: {cause}")
+                self.close()
+                time.sleep(delay)
+                
+    def _is_transient(self, error: Optional[BaseException]) -> bool:
+        """
+        Check whether a SQLite error is worth retrying on a fresh connection.
+        
+        Args:
+            error: Underlying sqlite3 exception
+            
+        Returns:
+            True for lock contention and I/O errors, False otherwise
+        """
+        if not isinstance(error, sqlite3.OperationalError):
+            return False
+        message = str(error).lower()
+        return any(marker in message for marker in self.TRANSIENT_ERRORS)
             
     def get_all_contacts(self) -> List[Dict]:
         """
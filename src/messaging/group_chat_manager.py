@@ -79,6 +79,11 @@ class GroupChatManager:
         Check for new group chats that include our system number.
         Detects both chats we create and chats others add us to.
         
+        Only chats above the state manager's last scanned chat ROWID are
+        queried. The mark advances past chats already recorded as processed
+        or rejected by this scan (not ours, or no messages since since_time),
+        stopping below the oldest chat that is still waiting to be processed.
+        
         Args:
             since_time: Optional timestamp to check from (in Messages epoch nanoseconds)
                        If not provided, will check all unprocessed chats
@@ -95,7 +100,8 @@ class GroupChatManager:
                 c.display_name,
                 c.style
             FROM chat c
-            WHERE c.style = 43  -- Group chats
+            WHERE c.ROWID > ?  -- Only chats not yet fully scanned
+            AND c.style = 43  -- Group chats
             AND (
                 -- Either we're a participant
                 EXISTS (
@@ -163,11 +169,14 @@ class GroupChatManager:
             phone_with_prefix = f'+1{phone_no_prefix}'
             logger.info(f"Checking for group chats with numbers: {phone_with_prefix} and {phone_no_prefix}")
             
+            last_scanned = self.state.get_last_scanned_chat_rowid()
+            logger.info(f"Scanning chats after ROWID {last_scanned}")
+            
             # Pass phone numbers twice - once for each format in EXISTS clause,
             # and once more for the LIKE check
             chats = self.db.execute_query(
                 query, 
-                (phone_with_prefix, phone_no_prefix, f'%{phone_no_prefix}%')
+                (last_scanned, phone_with_prefix, phone_no_prefix, f'%{phone_no_prefix}%')
             )
             logger.info(f"Found {len(chats)} total group chats")
             
@@ -175,8 +184,9 @@ class GroupChatManager:
             for idx, chat in enumerate(chats):
                 logger.info(f"Raw chat {idx}: {chat}")
             
-            # Filter for unprocessed chats
+            # Filter for unprocessed chats; settled chats need no further scans
             new_chats = []
+            settled_ids = set()
             for chat in chats:
                 try:
                     chat_info = {
@@ -203,6 +213,7 @@ class GroupChatManager:
                             # Only include chats with messages after last_check_time
                             if since_time and chat_info['last_message_date'] <= since_time:
                                 logger.info(f"Skipping chat {chat_info['guid']} - no new messages")
+                                settled_ids.add(chat_info['chat_id'])
                                 continue
                         
                         # Check if chat is already processed
@@ -214,14 +225,18 @@ class GroupChatManager:
                             new_chats.append(chat_info)
                         else:
                             logger.info(f"Skipping already processed chat: {chat_info['guid']}")
+                            settled_ids.add(chat_info['chat_id'])
                     else:
                         logger.info(f"Skipping chat we don't own: {chat_info['guid']}")
+                        settled_ids.add(chat_info['chat_id'])
                         
                 except Exception as e:
                     logger.error(f"Error processing chat result: {e}", exc_info=True)
                     logger.error(f"Problematic chat data: {chat}")
                     continue
                     
+            self._advance_chat_scan_mark(last_scanned, chats, settled_ids)
+            
             logger.info(f"Found {len(new_chats)} new unprocessed chats")
             return new_chats
             
@@ -233,6 +248,26 @@ class GroupChatManager:
             
         return new_chats
     
+    def _advance_chat_scan_mark(self, last_scanned: int, chats: List[Dict], settled_ids: set) -> None:
+        """
+        Move the last scanned chat ROWID past chats that need no further scans.
+        
+        Args:
+            last_scanned: Current last scanned chat ROWID
+            chats: Raw chat rows returned by the scan
+            settled_ids: Chat ROWIDs from the scan that are already processed
+                or were rejected by it
+        """
+        mark = last_scanned
+        for chat_id in sorted(chat['chat_id'] for chat in chats):
+            if chat_id not in settled_ids:
+                break
+            mark = chat_id
+            
+        if mark > last_scanned:
+            self.state.set_last_scanned_chat_rowid(mark)
+            logger.info(f"Advanced last scanned chat ROWID to {mark}")
+    
     def process_new_chat(self, chat_info: Dict) -> None:
         """
         Process a newly detected group chat.
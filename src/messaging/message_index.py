@@ -0,0 +1,146 @@
+"""
+Side index over the Messages database for fast message lookups.
+chat.db belongs to the Messages app, so indexes live in a separate database.
+"""
+
+import os
+import hashlib
+import sqlite3
+import logging
+from pathlib import Path
+from typing import Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class MessageIndexError(Exception):
+    """Raised when the message index cannot be created or updated."""
+    pass
+
+class MessageIndex:
+    """Maintains an FTS5 full-text index of message text, keyed by message ROWID."""
+
+    # Schema name the index is attached under on chat.db connections
+    SCHEMA = 'message_index'
+
+    # The trigram tokenizer matches arbitrary substrings of 3+ characters
+    MIN_QUERY_LENGTH = 3
+
+    def __init__(self, chat_db_path: str, index_path: Optional[str] = None):
+        """
+        Initialize the message index, creating it if needed.
+        
+        Args:
+            chat_db_path: Path to the Messages chat.db
+            index_path: Path to the index database. If None, uses a file under
+                ~/.imessage_crm named after chat_db_path.
+        
+        Raises:
+            MessageIndexError: If the index database cannot be created
+        """
+        self.chat_db_path = chat_db_path
+        self.index_path = index_path or self.default_path(chat_db_path)
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        
+        try:
+            with sqlite3.connect(self.index_path) as conn:
+                conn.executescript("""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS message_fts
+                        USING fts5(text, tokenize='trigram');
+                    
+                    -- Highest chat.db message ROWID already indexed
+                    CREATE TABLE IF NOT EXISTS index_state (
+                        key TEXT PRIMARY KEY,
+                        value INTEGER NOT NULL
+                    );
+                """)
+        except sqlite3.Error as e:
+            raise MessageIndexError(f"Unable to create message index: {e}") from e
+
+    @staticmethod
+    def default_path(chat_db_path: str) -> str:
+        """
+        Get the default index location for a chat.db.
+        
+        Args:
+            chat_db_path: Path to the Messages chat.db
+        
+        Returns:
+            Path under ~/.imessage_crm, unique per chat.db so that a fixture
+            database never shares an index with the live one
+        """
+        db_key = hashlib.sha1(str(Path(chat_db_path).resolve()).encode()).hexdigest()[:12]
+        return os.path.expanduser(f"~/.imessage_crm/message_index_{db_key}.db")
+
+    def supports(self, content: str) -> bool:
+        """
+        Check whether a content search can be answered by the index.
+        
+        Args:
+            content: Text being searched for
+        
+        Returns:
+            True if the text is long enough for trigram matching
+        """
+        return len(content) >= self.MIN_QUERY_LENGTH
+
+    @staticmethod
+    def match_expression(content: str) -> str:
+        """
+        Build an FTS5 MATCH expression for a literal substring search.
+        
+        Args:
+            content: Text being searched for
+        
+        Returns:
+            The text quoted as a single FTS5 phrase
+        """
+        return '"' + content.replace('"', '""') + '"'
+
+    def attach(self, conn: sqlite3.Connection) -> None:
+        """
+        Attach the index to a chat.db connection under SCHEMA.
+        
+        Args:
+            conn: Open connection to chat.db
+        """
+        conn.execute(f"ATTACH DATABASE ? AS {self.SCHEMA}", (self.index_path,))
+
+    def refresh(self) -> int:
+        """
+        Index messages added to chat.db since the last refresh.
+        
+        Returns:
+            Number of messages newly indexed
+        
+        Raises:
+            MessageIndexError: If chat.db cannot be read or the index updated
+        """
+        try:
+            # Open chat.db read-only; only the index is written
+            chat_uri = Path(self.chat_db_path).resolve().as_uri() + "?mode=ro"
+            with sqlite3.connect(Path(self.index_path).resolve().as_uri(), uri=True) as conn:
+                conn.execute("ATTACH DATABASE ? AS chat", (chat_uri,))
+                row = conn.execute(
+                    "SELECT value FROM index_state WHERE key = 'last_message_rowid'"
+                ).fetchone()
+                last_rowid = row[0] if row else 0
+                max_rowid = conn.execute("SELECT MAX(ROWID) FROM chat.message").fetchone()[0] or 0
+                if max_rowid <= last_rowid:
+                    return 0
+                
+                cursor = conn.execute("""
+                    INSERT INTO message_fts (rowid, text)
+                    SELECT ROWID, text FROM chat.message
+                    WHERE ROWID > ? AND ROWID <= ? AND text IS NOT NULL
+                """, (last_rowid, max_rowid))
+                conn.execute("""
+                    INSERT OR REPLACE INTO index_state (key, value)
+                    VALUES ('last_message_rowid', ?)
+                """, (max_rowid,))
+            
+            logger.info(f"Indexed {cursor.rowcount} new messages up to ROWID {max_rowid}")
+            return cursor.rowcount
+        except sqlite3.Error as e:
+            raise MessageIndexError(f"Unable to refresh message index: {e}") from e
@@ -4,17 +4,27 @@ Uses SQLite to access the Messages database with proper error handling.
 """
 
 import os
+import time
+import base64
 import sqlite3
 import logging
-from typing import List, Dict, Optional, Any
+import threading
+from functools import cached_property
+from operator import itemgetter
+from typing import List, Dict, Optional, Any, Tuple, Union, Callable, Set
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta
+from src.database.db_connector import DatabaseConnector, DatabaseError
 from .search_history import SearchHistory
+from .message_index import MessageIndex, MessageIndexError
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Seconds between the Unix epoch and 2001-01-01 UTC, where chat.db dates start
+APPLE_EPOCH_OFFSET = 978307200
+
 class MessageReadError(Exception):
     """Base exception for message reading errors."""
     pass
@@ -43,12 +53,31 @@ class MessageService:
 
 class SearchResult:
     """Represents a paginated search result."""
-    def __init__(self, messages: List[Dict], total_count: int, page: int, page_size: int):
+    def __init__(
+        self,
+        messages: List[Dict],
+        total_count: Union[int, Callable[[], int]],
+        page: int,
+        page_size: int,
+        next_cursor: Optional[str] = None
+    ):
         self.messages = messages
-        self.total_count = total_count
+        # Either the count or a function computing it on first access
+        self._total_count = total_count
         self.page = page
         self.page_size = page_size
-        self.total_pages = (total_count + page_size - 1) // page_size
+        # Opaque cursor for the page after this one, None on the last page
+        self.next_cursor = next_cursor
+
+    @cached_property
+    def total_count(self) -> int:
+        if callable(self._total_count):
+            return self._total_count()
+        return self._total_count
+
+    @property
+    def total_pages(self) -> int:
+        return (self.total_count + self.page_size - 1) // self.page_size
 
     def has_next_page(self) -> bool:
         return self.page < self.total_pages
@@ -59,12 +88,79 @@ class SearchResult:
 class MessageReader:
     """Handles reading messages from the macOS Messages app database."""
     
-    def __init__(self):
-        """Initialize the message reader."""
-        self.db_path = os.path.expanduser("~/Library/Messages/chat.db")
+    DEFAULT_DB_PATH = "~/Library/Messages/chat.db"
+    
+    # Seconds a search's total count is reused by later pages of the same search
+    COUNT_CACHE_TTL = 60.0
+    
+    # Most searches whose counts are kept at once
+    COUNT_CACHE_SIZE = 128
+    
+    # Points readers created without a db_path at another chat.db (e.g. a test fixture)
+    DB_PATH_ENV = 'IMESSAGE_TEST_DB'
+    
+    # Columns and joins shared by the message searches; _format_message
+    # unpacks rows in this column order. A message has one row per
+    # attachment, so (raw_date, rowid, attachment_rowid) is the unique sort key
+    MESSAGE_SELECT = """
+        SELECT 
+            message.text,
+            handle.id as sender,
+            datetime(message.date/1000000000 + strftime('%s', '2001-01-01'), 
+                    'unixepoch', 'localtime') as date,
+            message.is_from_me,
+            message.service,
+            message.date as raw_date,
+            message.is_read,
+            message.cache_has_attachments as has_attachment,
+            attachment.filename as attachment_name,
+            attachment.mime_type as attachment_type,
+            message.ROWID as rowid,
+            COALESCE(attachment.ROWID, 0) as attachment_rowid
+            {extra_columns}
+        FROM message 
+        LEFT JOIN handle ON message.handle_id = handle.ROWID
+        LEFT JOIN chat_message_join ON message.ROWID = chat_message_join.message_id
+        LEFT JOIN chat ON chat_message_join.chat_id = chat.ROWID
+        LEFT JOIN message_attachment_join ON message.ROWID = message_attachment_join.message_id
+        LEFT JOIN attachment ON message_attachment_join.attachment_id = attachment.ROWID
+        WHERE message.service IN ('SMS', 'iMessage')
+    """
+    
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Initialize the message reader.
+        
+        Args:
+            db_path: Optional path to chat.db. If None, uses $IMESSAGE_TEST_DB
+                when set, otherwise the Messages app's default location.
+        """
+        self.db_path = (
+            db_path
+            or os.environ.get(self.DB_PATH_ENV)
+            or os.path.expanduser(self.DEFAULT_DB_PATH)
+        )
         logger.info(f"Initializing MessageReader with database at {self.db_path}")
+        
+        # Per-thread connections come from a DatabaseConnector, opened once
+        # access is verified; this tracks which connection has the index attached
+        self._local = threading.local()
+        self._db: Optional[DatabaseConnector] = None
         self._verify_database_access()
         self.search_history = SearchHistory()
+        
+        # handle.id -> handle ROWIDs, so sender searches can filter message.handle_id directly
+        self._handle_rowids: Dict[str, List[int]] = {}
+        
+        # Search filters (without pagination) -> (total count, monotonic time counted)
+        self._count_cache: Dict[tuple, Tuple[int, float]] = {}
+        
+        # Full-text index for content searches; fall back to LIKE scans without it
+        try:
+            self.message_index = MessageIndex(self.db_path)
+        except MessageIndexError as e:
+            logger.warning(f"Message index unavailable, content search will scan chat.db: {e}")
+            self.message_index = None
     
     def _verify_database_access(self):
         """
@@ -93,10 +189,11 @@ class MessageReader:
             )
             
         try:
-            # Try to read from the database
+            # Try to read from the database; rows come back as plain tuples
+            self._db = DatabaseConnector(self.db_path, row_factory=None)
             self._execute_query("SELECT 1")
             logger.info("Successfully verified database access")
-        except sqlite3.Error as e:
+        except (DatabaseError, DatabaseAccessError) as e:
             # Check if database is locked
             if 'database is locked' in str(e).lower():
                 raise DatabaseAccessError(
@@ -112,13 +209,17 @@ class MessageReader:
                     "or your Python environment."
                 )
     
-    def _execute_query(self, query: str, params: tuple = ()) -> List[tuple]:
+    def _execute_query(self, query: str, params: tuple = (), attach_index: bool = False) -> List[tuple]:
         """
         Execute a SQLite query on the Messages database.
         
+        Transient errors are retried on a fresh connection, see
+        DatabaseConnector.run_with_retry.
+        
         Args:
             query: SQL query to execute
             params: Query parameters
+            attach_index: Whether to attach the message index under MessageIndex.SCHEMA
             
         Returns:
             List of query results
@@ -126,18 +227,26 @@ class MessageReader:
         Raises:
             DatabaseAccessError: If unable to execute the query
         """
+        def run(conn: sqlite3.Connection) -> List[tuple]:
+            # Connections are reopened after errors, so attach per connection
+            if attach_index and getattr(self._local, 'index_conn', None) is not conn:
+                self.message_index.attach(conn)
+                self._local.index_conn = conn
+            return conn.execute(query, params).fetchall()
+            
         try:
             logger.debug(f"Executing query: {query} with params: {params}")
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute(query, params)
-                results = cursor.fetchall()
-                logger.debug(f"Query returned {len(results)} results")
-                return results
-        except sqlite3.Error as e:
+            results = self._db.run_with_retry(run)
+            logger.debug(f"Query returned {len(results)} results")
+            return results
+        except DatabaseError as e:
             logger.error(f"Database query failed: {e}")
             raise DatabaseAccessError(f"Database query failed: {e}")
     
+    def close(self) -> None:
+        """Close the calling thread's database connection, if one is open."""
+        self._db.close()
+    
     def get_recent_messages(
         self,
         chat_id: Optional[str] = None,
@@ -229,7 +338,8 @@ class MessageReader:
         read_status: Optional[bool] = None,
         has_attachments: Optional[bool] = None,
         page: int = 1,
-        page_size: int = 20
+        page_size: int = 20,
+        after_cursor: Optional[str] = None
     ) -> SearchResult:
         """
         Search messages with various filters and pagination.
@@ -239,54 +349,60 @@ class MessageReader:
             sender: Sender's phone number or email
             start_date: Start date in ISO format (YYYY-MM-DD)
             end_date: End date in ISO format (YYYY-MM-DD)
-            page: Page number (1-based)
+            page: Page number (1-based), ignored when after_cursor is given
             page_size: Number of results per page
+            after_cursor: A previous result's next_cursor; returns the messages
+                that follow it without skipping rows via OFFSET
             
         Returns:
-            SearchResult object containing paginated messages and metadata
+            SearchResult object containing paginated messages and metadata;
+            each message carries its chat.db ROWID as 'rowid'. A new search
+            (without after_cursor) counts its results straight away to record
+            them in search history; pages fetched with after_cursor count only
+            when total_count is read. Either way, counts are reused by
+            searches with the same filters for COUNT_CACHE_TTL seconds.
             
         Raises:
-            MessageReadError: If unable to search messages
+            MessageReadError: If unable to search messages or after_cursor is invalid
         """
         try:
-            # Calculate offset for pagination
-            offset = (page - 1) * page_size
+            # Calculate offset for pagination (a keyset cursor needs none)
+            after = self._decode_cursor(after_cursor) if after_cursor else None
+            offset = 0 if after else (page - 1) * page_size
+            
+            # Reduce type and service filters to known, de-duplicated plain
+            # strings once, so both queries bind the same values
+            valid_types = self._filter_values(message_types, MessageType.all_types())
+            valid_services = self._filter_values(services, MessageService.all_services())
+            
+            # Compare raw message.date against the range so its index can be used
+            date_sql, date_params = self._date_filter(start_date, end_date)
             
             # Base query with common table expression for filtering
-            query = """
-                WITH RECURSIVE
-                filtered_messages AS (
-                    SELECT 
-                        message.text,
-                        handle.id as sender,
-                        datetime(message.date/1000000000 + strftime('%s', '2001-01-01'), 
-                                'unixepoch', 'localtime') as date,
-                        message.is_from_me,
-                        message.service,
-                        message.date as raw_date,
-                        message.is_read,
-                        message.cache_has_attachments as has_attachment,
-                        attachment.filename as attachment_name,
-                        attachment.mime_type as attachment_type
-                    FROM message 
-                    LEFT JOIN handle ON message.handle_id = handle.ROWID
-                    LEFT JOIN chat_message_join ON message.ROWID = chat_message_join.message_id
-                    LEFT JOIN chat ON chat_message_join.chat_id = chat.ROWID
-                    LEFT JOIN message_attachment_join ON message.ROWID = message_attachment_join.message_id
-                    LEFT JOIN attachment ON message_attachment_join.attachment_id = attachment.ROWID
-                    WHERE message.service IN ('SMS', 'iMessage')
-            """
+            query = (
+                "WITH RECURSIVE filtered_messages AS ("
+                + self.MESSAGE_SELECT.format(extra_columns='')
+            )
             
             params = []
             
+            # Use the full-text index for content searches it can answer
+            use_index = bool(content) and self._refresh_message_index(content)
+            content_filter = (
+                f" AND message.ROWID IN (SELECT rowid FROM {MessageIndex.SCHEMA}.message_fts"
+                " WHERE message_fts MATCH ?) "
+            )
+            
             # Add content search
-            if content:
+            if use_index:
+                query += content_filter
+                params.append(MessageIndex.match_expression(content))
+            elif content:
                 query += " AND message.text LIKE ? "
                 params.append(f"%{content}%")
                 
             # Add message type filter
-            if message_types:
-                valid_types = [t for t in message_types if t in MessageType.all_types()]
+            if valid_types:
                 if MessageType.ATTACHMENT in valid_types:
                     if MessageType.TEXT in valid_types:
                         pass  # No filter needed for both types
@@ -296,12 +412,10 @@ class MessageReader:
                     query += " AND message.cache_has_attachments = 0"
                     
             # Add service filter
-            if services:
-                valid_services = [s for s in services if s in MessageService.all_services()]
-                if valid_services:
-                    placeholders = ','.join(['?'] * len(valid_services))
-                    query += f" AND message.service IN ({placeholders})"
-                    params.extend(valid_services)
+            if valid_services:
+                placeholders = ','.join(['?'] * len(valid_services))
+                query += f" AND message.service IN ({placeholders})"
+                params.extend(valid_services)
                     
             # Add read status filter
             if read_status is not None:
@@ -315,37 +429,36 @@ class MessageReader:
             
             # Add sender filter
             if sender:
-                query += " AND (handle.id = ? OR (message.is_from_me = 1 AND handle.id = ?)) "
-                params.extend([sender, sender])
+                sender_sql, sender_params = self._sender_filter(sender)
+                query += sender_sql
+                params.extend(sender_params)
                 logger.info(f"Searching for sender (both sent and received): {sender}")
             
             # Add date range filters
-            if start_date:
-                query += (
-                    " AND date(datetime(message.date/1000000000 + strftime('%s', '2001-01-01'), "
-                    "'unixepoch', 'localtime')) >= date(?) "
-                )
-                params.append(start_date)
-            if end_date:
-                query += (
-                    " AND date(datetime(message.date/1000000000 + strftime('%s', '2001-01-01'), "
-                    "'unixepoch', 'localtime')) <= date(?) "
-                )
-                params.append(end_date)
+            query += date_sql
+            params.extend(date_params)
+                
+            # Seek past the cursor instead of skipping rows with OFFSET
+            if after:
+                query += " AND (message.date, message.ROWID, COALESCE(attachment.ROWID, 0)) < (?, ?, ?) "
+                params.extend(after)
             query += """
                 )
                 SELECT * FROM filtered_messages
-                ORDER BY raw_date DESC
+                ORDER BY raw_date DESC, rowid DESC, attachment_rowid DESC
                 LIMIT ? OFFSET ?
             """
-            params.extend([page_size, offset])
+            # One extra row tells whether another page follows
+            params.extend([page_size + 1, offset])
             
             # Log the query and params
             logger.info(f"Executing query: {query}")
             logger.info(f"With parameters: {params}")
             
             # Execute query for paginated results
-            results = self._execute_query(query, tuple(params))
+            results = self._execute_query(query, tuple(params), attach_index=use_index)
+            has_more = len(results) > page_size
+            results = results[:page_size]
             
             # Get total count for pagination
             count_query = """
@@ -366,11 +479,13 @@ class MessageReader:
             
             # Add the same filters to count query
             count_params = []
-            if content:
+            if use_index:
+                count_query += content_filter
+                count_params.append(MessageIndex.match_expression(content))
+            elif content:
                 count_query += " AND message.text LIKE ? "
                 count_params.append(f"%{content}%")
-            if message_types:
-                valid_types = [t for t in message_types if t in MessageType.all_types()]
+            if valid_types:
                 if MessageType.ATTACHMENT in valid_types:
                     if MessageType.TEXT in valid_types:
                         pass  # No filter needed for both types
@@ -378,12 +493,10 @@ class MessageReader:
                         count_query += " AND message.cache_has_attachments = 1"
                 elif MessageType.TEXT in valid_types:
                     count_query += " AND message.cache_has_attachments = 0"
-            if services:
-                valid_services = [s for s in services if s in MessageService.all_services()]
-                if valid_services:
-                    placeholders = ','.join(['?'] * len(valid_services))
-                    count_query += f" AND message.service IN ({placeholders})"
-                    count_params.extend(valid_services)
+            if valid_services:
+                placeholders = ','.join(['?'] * len(valid_services))
+                count_query += f" AND message.service IN ({placeholders})"
+                count_params.extend(valid_services)
             if read_status is not None:
                 count_query += " AND message.is_read = ?"
                 count_params.append(1 if read_status else 0)
@@ -391,71 +504,455 @@ class MessageReader:
                 count_query += " AND message.cache_has_attachments = ?"
                 count_params.append(1 if has_attachments else 0)
             if sender:
-                count_query += " AND (handle.id = ? OR (message.is_from_me = 1 AND ? IN ('me', 'self'))) "
-                normalized_sender = ''.join(filter(str.isdigit, sender))
-                if len(normalized_sender) == 10:
-                    normalized_sender = '+1' + normalized_sender
-                elif len(normalized_sender) == 11 and normalized_sender.startswith('1'):
-                    normalized_sender = '+' + normalized_sender
-                count_params.extend([normalized_sender, sender.lower()])
-            if start_date:
-                count_query += (
-                    " AND date(datetime(message.date/1000000000 + strftime('%s', '2001-01-01'), "
-                    "'unixepoch', 'localtime')) >= date(?) "
-                )
-                count_params.append(start_date)
-            if end_date:
-                count_query += (
-                    " AND date(datetime(message.date/1000000000 + strftime('%s', '2001-01-01'), "
-                    "'unixepoch', 'localtime')) <= date(?) "
-                )
-                count_params.append(end_date)
+                count_query += sender_sql
+                count_params.extend(sender_params)
+            count_query += date_sql
+            count_params.extend(date_params)
             count_query += ")"
             
-            # Use the same parameters for count query
-            total_count = self._execute_query(count_query, tuple(count_params))[0][0]
+            # Count lazily, reusing a recent count for the same filters
+            count_key = (
+                content, sender, start_date, end_date, tuple(valid_types),
+                tuple(valid_services), read_status, has_attachments
+            )
+            
+            def count_messages() -> int:
+                cached = self._count_cache.get(count_key)
+                if cached and time.monotonic() - cached[1] < self.COUNT_CACHE_TTL:
+                    return cached[0]
+                try:
+                    total = self._execute_query(
+                        count_query, tuple(count_params), attach_index=use_index
+                    )[0][0]
+                except DatabaseAccessError as e:
+                    logger.error(f"Failed to count messages: {e}")
+                    raise MessageReadError(f"Failed to count messages: {e}")
+                self._cache_count(count_key, total)
+                return total
             
             # Format results
-            messages = []
-            for row in results:
-                text, sender, date, is_from_me, service, _, is_read, has_attachment, attachment_name, attachment_type = row
-                
-                # Get attachment info if present
-                attachment_info = None
-                if has_attachment:
-                    attachment_info = {
-                        'filename': attachment_name,
-                        'mime_type': attachment_type
-                    }
-                
-                messages.append({
-                    'text': text,
-                    'sender': 'me' if is_from_me else (sender or 'unknown'),
-                    'timestamp': date,
-                    'is_from_me': bool(is_from_me),
-                    'service': service,
-                    'is_read': bool(is_read),
-                    'has_attachment': bool(has_attachment),
-                    'attachment': attachment_info
-                })
+            messages = [self._format_message(row) for row in results]
+            
+            # The cursor is the last row's sort key (raw_date, rowid, attachment_rowid)
+            next_cursor = self._encode_cursor(*itemgetter(5, 10, 11)(results[-1])) if has_more else None
+            result = SearchResult(messages, count_messages, page, page_size, next_cursor)
+            logger.info(f"Returning page {page} ({len(messages)} messages)")
+            
+            # Track new searches in history; following a cursor continues one,
+            # and leaves the count to be computed only if the caller reads it
+            if not after:
+                self.search_history.add_search(
+                    content=content,
+                    sender=sender,
+                    start_date=start_date,
+                    end_date=end_date,
+                    result_count=result.total_count
+                )
             
-            logger.info(f"Found {total_count} messages, returning page {page} ({len(messages)} messages)")
+            return result
             
-            # Track search in history
-            self.search_history.add_search(
-                content=content,
-                sender=sender,
-                start_date=start_date,
-                end_date=end_date,
-                result_count=total_count
+        except DatabaseAccessError as e:
+            logger.error(f"Failed to search messages: {e}")
+            raise MessageReadError(f"Failed to search messages: {e}")
+    
+    def search_messages_multi(
+        self,
+        filters: Dict[str, Dict[str, Any]],
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        limit: int = 1000
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Run several filter combinations over the same messages in one query.
+        
+        Each filter is turned into a predicate; the query selects messages
+        matching any of them and projects one flag per filter, so a single
+        scan fills every bucket. Rows are numbered within each bucket, so
+        every bucket gets up to limit messages of its own.
+        
+        Args:
+            filters: Bucket name -> criteria, where criteria may contain
+                message_types, services, read_status and has_attachments with
+                the same meaning as in search_messages
+            start_date: Start date in ISO format (YYYY-MM-DD), shared by all buckets
+            end_date: End date in ISO format (YYYY-MM-DD), shared by all buckets
+            limit: Maximum number of most recent messages per bucket
+            
+        Returns:
+            Dictionary mapping each bucket name to its messages, newest first
+            
+        Raises:
+            MessageReadError: If unable to search messages
+        """
+        names = list(filters)
+        if not names:
+            return {}
+        
+        try:
+            bucket_sql = []
+            bucket_params = []
+            for name in names:
+                criteria = filters[name]
+                predicates = ["1"]
+                valid_types = self._filter_values(criteria.get('message_types'), MessageType.all_types())
+                if valid_types == [MessageType.TEXT]:
+                    predicates.append("message.cache_has_attachments = 0")
+                elif valid_types == [MessageType.ATTACHMENT]:
+                    predicates.append("message.cache_has_attachments = 1")
+                valid_services = self._filter_values(criteria.get('services'), MessageService.all_services())
+                if valid_services:
+                    predicates.append(f"message.service IN ({','.join(['?'] * len(valid_services))})")
+                    bucket_params.extend(valid_services)
+                if criteria.get('read_status') is not None:
+                    predicates.append("message.is_read = ?")
+                    bucket_params.append(1 if criteria['read_status'] else 0)
+                if criteria.get('has_attachments') is not None:
+                    predicates.append("message.cache_has_attachments = ?")
+                    bucket_params.append(1 if criteria['has_attachments'] else 0)
+                bucket_sql.append(f"({' AND '.join(predicates)})")
+            
+            # Each predicate appears twice: as a projected flag and in the WHERE clause
+            flags = ''.join(f", {sql} AS bucket_{i}" for i, sql in enumerate(bucket_sql))
+            date_sql, date_params = self._date_filter(start_date, end_date)
+            
+            # Number each bucket's rows newest first; a row is kept while it
+            # is within limit for any bucket that it belongs to
+            ranks = ''.join(
+                f", ROW_NUMBER() OVER (PARTITION BY bucket_{i} ORDER BY raw_date DESC, rowid DESC, attachment_rowid DESC) AS rank_{i}"
+                for i in range(len(names))
             )
+            in_limit = ' OR '.join(f"(bucket_{i} AND rank_{i} <= ?)" for i in range(len(names)))
+            query = (
+                "WITH matched AS ("
+                + self.MESSAGE_SELECT.format(extra_columns=flags)
+                + f" AND ({' OR '.join(bucket_sql)})"
+                + date_sql
+                + f"), ranked AS (SELECT *{ranks} FROM matched)"
+                + f" SELECT * FROM ranked WHERE {in_limit}"
+                + " ORDER BY raw_date DESC, rowid DESC, attachment_rowid DESC"
+            )
+            params = bucket_params + bucket_params + date_params + [limit] * len(names)
+            
+            results = self._execute_query(query, tuple(params))
             
-            return SearchResult(messages, total_count, page, page_size)
+            # Partition rows by their bucket flags and ranks in a single pass
+            buckets = {name: [] for name in names}
+            for row in results:
+                message = self._format_message(row)
+                in_buckets = row[12:12 + len(names)]
+                bucket_ranks = row[12 + len(names):]
+                for name, in_bucket, rank in zip(names, in_buckets, bucket_ranks):
+                    if in_bucket and rank <= limit:
+                        buckets[name].append(message)
+            
+            logger.info(
+                "Multi-filter search: " +
+                ", ".join(f"{name}={len(messages)}" for name, messages in buckets.items())
+            )
+            return buckets
             
         except DatabaseAccessError as e:
             logger.error(f"Failed to search messages: {e}")
             raise MessageReadError(f"Failed to search messages: {e}")
     
+    def count_by_read_status(self, sender: str) -> Dict[str, int]:
+        """
+        Count a sender's read and unread messages in one pass.
+        
+        Args:
+            sender: Sender's phone number or email, or 'me'/'self'
+            
+        Returns:
+            Dictionary with 'read' and 'unread' message counts
+            
+        Raises:
+            MessageReadError: If unable to count messages
+        """
+        try:
+            sender_sql, sender_params = self._sender_filter(sender)
+            row = self._execute_query(f"""
+                SELECT
+                    COALESCE(SUM(CASE WHEN message.is_read = 1 THEN 1 ELSE 0 END), 0),
+                    COALESCE(SUM(CASE WHEN message.is_read = 0 THEN 1 ELSE 0 END), 0)
+                FROM message
+                WHERE message.service IN ('SMS', 'iMessage')
+                AND (
+                    length(message.text) > 0
+                    OR message.cache_has_attachments = 1
+                )
+                {sender_sql}
+            """, tuple(sender_params))[0]
+            return {'read': row[0], 'unread': row[1]}
+            
+        except DatabaseAccessError as e:
+            logger.error(f"Failed to count messages: {e}")
+            raise MessageReadError(f"Failed to count messages: {e}")
+    
+    def distinct_services(self, sender: str, services: Optional[List[str]] = None) -> Set[str]:
+        """
+        Get the services a sender's messages were sent over.
+        
+        Args:
+            sender: Sender's phone number or email, or 'me'/'self'
+            services: Optional list of services to restrict to, as in
+                search_messages
+            
+        Returns:
+            Set of service names, e.g. {'SMS', 'iMessage'}
+            
+        Raises:
+            MessageReadError: If unable to read messages
+        """
+        try:
+            sender_sql, sender_params = self._sender_filter(sender)
+            valid_services = (
+                self._filter_values(services, MessageService.all_services())
+                or MessageService.all_services()
+            )
+            placeholders = ','.join(['?'] * len(valid_services))
+            rows = self._execute_query(f"""
+                SELECT DISTINCT message.service
+                FROM message
+                WHERE message.service IN ({placeholders})
+                AND (
+                    length(message.text) > 0
+                    OR message.cache_has_attachments = 1
+                )
+                {sender_sql}
+            """, tuple(valid_services) + tuple(sender_params))
+            return {row[0] for row in rows}
+            
+        except DatabaseAccessError as e:
+            logger.error(f"Failed to read message services: {e}")
+            raise MessageReadError(f"Failed to read message services: {e}")
+    
+    def _cache_count(self, key: tuple, total: int) -> None:
+        """
+        Remember a search's total count, evicting stale entries.
+        
+        Args:
+            key: Search filters, without pagination
+            total: Number of matching messages
+        """
+        now = time.monotonic()
+        if len(self._count_cache) >= self.COUNT_CACHE_SIZE:
+            self._count_cache = {
+                cached_key: entry for cached_key, entry in self._count_cache.items()
+                if now - entry[1] < self.COUNT_CACHE_TTL
+            }
+            # Still full of fresh counts: drop the oldest
+            while len(self._count_cache) >= self.COUNT_CACHE_SIZE:
+                del self._count_cache[next(iter(self._count_cache))]
+        # Re-insert so the dict stays ordered oldest first
+        self._count_cache.pop(key, None)
+        self._count_cache[key] = (total, now)
+    
+    @staticmethod
+    def _format_message(row: tuple) -> Dict[str, Any]:
+        """
+        Convert a row selected with MESSAGE_SELECT to a message dictionary.
+        
+        Args:
+            row: Result row; columns after rowid are ignored
+            
+        Returns:
+            Message dictionary as returned by the searches
+        """
+        text, sender, date, is_from_me, service, _, is_read, has_attachment, attachment_name, attachment_type, rowid = row[:11]
+        
+        # Get attachment info if present
+        attachment_info = None
+        if has_attachment:
+            attachment_info = {
+                'filename': attachment_name,
+                'mime_type': attachment_type
+            }
+        
+        return {
+            'text': text,
+            'sender': 'me' if is_from_me else (sender or 'unknown'),
+            'timestamp': date,
+            'is_from_me': bool(is_from_me),
+            'service': service,
+            'is_read': bool(is_read),
+            'has_attachment': bool(has_attachment),
+            'attachment': attachment_info,
+            'rowid': rowid
+        }
+    
+    @classmethod
+    def _date_filter(cls, start_date: Optional[str], end_date: Optional[str]) -> Tuple[str, List[int]]:
+        """
+        Build the SQL condition restricting message.date to a date range.
+        
+        Args:
+            start_date: Start date in ISO format (YYYY-MM-DD), or None
+            end_date: Inclusive end date in ISO format (YYYY-MM-DD), or None
+            
+        Returns:
+            Tuple of SQL fragment (starting with AND, or empty) and its parameters
+        """
+        start, end = cls._date_bounds(start_date, end_date)
+        sql, params = "", []
+        if start_date:
+            sql += " AND message.date >= ? "
+            params.append(start)
+        if end_date:
+            sql += " AND message.date < ? "
+            params.append(end)
+        return sql, params
+    
+    @staticmethod
+    def _date_bounds(start_date: Optional[str], end_date: Optional[str]) -> Tuple[Optional[int], Optional[int]]:
+        """
+        Convert an inclusive local date range to chat.db message.date bounds.
+        
+        Args:
+            start_date: First day in ISO format (YYYY-MM-DD), or None
+            end_date: Last day in ISO format (YYYY-MM-DD), or None
+            
+        Returns:
+            Tuple of (lower bound, exclusive upper bound) in nanoseconds since
+            2001-01-01, with None for a missing date
+            
+        Raises:
+            MessageReadError: If a date is not in YYYY-MM-DD format
+        """
+        def apple_time(day: datetime) -> int:
+            return int(day.timestamp() - APPLE_EPOCH_OFFSET) * 1_000_000_000
+        
+        try:
+            start = apple_time(datetime.strptime(start_date, "%Y-%m-%d")) if start_date else None
+            end = (
+                apple_time(datetime.strptime(end_date, "%Y-%m-%d") + timedelta(days=1))
+                if end_date else None
+            )
+        except ValueError as e:
+            raise MessageReadError(f"Invalid date range {start_date!r} to {end_date!r}: {e}") from e
+        return start, end
+    
+    @staticmethod
+    def _encode_cursor(raw_date: int, rowid: int, attachment_rowid: int) -> str:
+        """
+        Encode a result row's sort key as an opaque pagination cursor.
+        
+        Args:
+            raw_date: The message's chat.db date
+            rowid: The message's ROWID
+            attachment_rowid: The row's attachment ROWID, 0 without one
+            
+        Returns:
+            URL-safe cursor string
+        """
+        return base64.urlsafe_b64encode(f"{raw_date}|{rowid}|{attachment_rowid}".encode()).decode()
+    
+    @staticmethod
+    def _decode_cursor(cursor: str) -> Tuple[int, int, int]:
+        """
+        Decode a pagination cursor created by _encode_cursor.
+        
+        Args:
+            cursor: Cursor string
+            
+        Returns:
+            Tuple of (raw_date, rowid, attachment_rowid)
+            
+        Raises:
+            MessageReadError: If the cursor is malformed
+        """
+        try:
+            raw_date, rowid, attachment_rowid = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+            return int(raw_date), int(rowid), int(attachment_rowid)
+        except (ValueError, UnicodeDecodeError) as e:
+            raise MessageReadError(f"Invalid pagination cursor: {cursor}") from e
+    
+    @staticmethod
+    def _filter_values(values: Optional[List[Any]], allowed: List[str]) -> List[str]:
+        """
+        Normalize filter values to the plain strings bound into SQL.
+        
+        Enum members are reduced to their value; unknown values and
+        duplicates are dropped, keeping the first occurrence's order.
+        
+        Args:
+            values: Requested filter values, or None
+            allowed: Valid values for the filter
+            
+        Returns:
+            List of valid, unique string values
+        """
+        normalized = (getattr(value, 'value', value) for value in values or [])
+        return list(dict.fromkeys(value for value in normalized if value in allowed))
+    
+    def _sender_filter(self, sender: str) -> Tuple[str, List[Any]]:
+        """
+        Build the sender condition shared by the search and count queries.
+        
+        Filtering message.handle_id directly (rather than handle.id through
+        the join) lets SQLite use chat.db's (handle_id, date) index for
+        sender + date range searches. 'me' or 'self' also match sent messages.
+        
+        Args:
+            sender: Sender's phone number or email, or 'me'/'self'
+            
+        Returns:
+            Tuple of (SQL condition starting with AND, parameters)
+        """
+        handle_rowids = self._get_handle_rowids(sender)
+        condition = f"message.handle_id IN ({','.join(['?'] * len(handle_rowids))})"
+        if sender.lower() in ('me', 'self'):
+            condition = f"({condition} OR message.is_from_me = 1)"
+        return f" AND {condition} ", list(handle_rowids)
+    
+    def _get_handle_rowids(self, sender: str) -> List[int]:
+        """
+        Resolve a sender identifier to its handle ROWIDs.
+        
+        A phone number or email can have several handles (e.g. one per service).
+        Phone numbers given without a country code also match their +1 form.
+        Results are cached; unknown senders are looked up again next time.
+        
+        Args:
+            sender: Sender's phone number or email
+            
+        Returns:
+            List of matching handle ROWIDs (empty if the sender is unknown)
+        """
+        if sender not in self._handle_rowids:
+            normalized_sender = ''.join(filter(str.isdigit, sender))
+            if len(normalized_sender) == 10:
+                normalized_sender = '+1' + normalized_sender
+            elif len(normalized_sender) == 11 and normalized_sender.startswith('1'):
+                normalized_sender = '+' + normalized_sender
+            else:
+                normalized_sender = sender
+            rowids = [row[0] for row in self._execute_query(
+                "SELECT ROWID FROM handle WHERE id IN (?, ?)", (sender, normalized_sender)
+            )]
+            if not rowids:
+                return []
+            self._handle_rowids[sender] = rowids
+        return self._handle_rowids[sender]
+    
+    def _refresh_message_index(self, content: str) -> bool:
+        """
+        Bring the message index up to date if it can answer a content search.
+        
+        Args:
+            content: Text being searched for
+            
+        Returns:
+            True if the index is current and should be used for the search
+        """
+        if self.message_index is None or not self.message_index.supports(content):
+            return False
+        try:
+            self.message_index.refresh()
+            return True
+        except MessageIndexError as e:
+            logger.warning(f"Falling back to LIKE content search: {e}")
+            return False
+    
     def get_recent_chats(self, limit: int = 20) -> List[Dict[str, Any]]:
         """
         Get most recent chats ordered by last message date.
@@ -1043,7 +1540,7 @@ class MessageReader:
                     'is_group': bool(row[4]),
                     'participant_count': row[5],
                     'participants': row[6].split(',') if row[6] else [],
-                    'last_message_date': datetime.fromtimestamp(row[7] / 1e9 + 978307200) if row[7] else None,
+                    'last_message_date': datetime.fromtimestamp(row[7] / 1e9 + APPLE_EPOCH_OFFSET) if row[7] else None,
                     'message_count': row[8]
                 }
                 chats.append(chat)
@@ -3,7 +3,9 @@ MessageSender module for sending iMessages through AppleScript.
 Handles message sending, rate limiting, and error handling.
 """
 
+import queue
 import subprocess
+import threading
 import time
 import logging
 from typing import Optional, Dict, List
@@ -14,6 +16,27 @@ from pathlib import Path
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Backslashes and double quotes must be escaped inside AppleScript strings
+_APPLESCRIPT_ESCAPE = str.maketrans({'\\': '\\\\', '"': '\\"'})
+
+# Also escapes newlines, for source passed on one line to `run script`
+_RUN_SCRIPT_ESCAPE = str.maketrans({'\\': '\\\\', '"': '\\"', '\n': '\\n'})
+
+_SEND_SCRIPT = '''
+    tell application "Messages"
+        set targetBuddy to "%s"
+        set targetService to id of 1st service whose service type = iMessage
+        send "%s" to buddy targetBuddy of service id targetService
+    end tell
+'''
+
+_GROUP_SEND_SCRIPT = '''
+    tell application "Messages"
+        set targetChat to first chat where id is "%s"
+        send "%s" to targetChat
+    end tell
+'''
+
 @dataclass
 class RateLimit:
     """Rate limiting configuration."""
@@ -31,6 +54,17 @@ class SendError(MessageError):
 class MessageSender:
     """Handles sending messages through the macOS Messages app."""
     
+    # Echoed after each script so _run_script knows where its output ends
+    SCRIPT_DONE = "osa-script-done"
+    
+    # Prefix of the value a script returns when it raises an error
+    SCRIPT_ERROR = "osa-script-error:"
+    
+    # Seconds to wait for each line of script output before giving up on
+    # osascript; bulk scripts log a line per recipient, so this bounds the
+    # wait per send rather than for the whole script
+    SCRIPT_READ_TIMEOUT = 30.0
+    
     def __init__(self, rate_limit: Optional[RateLimit] = None):
         """
         Initialize the message sender.
@@ -41,6 +75,134 @@ class MessageSender:
         self.rate_limit = rate_limit or RateLimit()
         self._last_send_time = 0
         
+        # Persistent `osascript -i` process, started on first use
+        self._osa_proc: Optional[subprocess.Popen] = None
+        self._osa_lines: Optional[queue.Queue] = None
+        self._osa_lock = threading.Lock()
+        
+    @staticmethod
+    def _clean_output_line(line: str) -> str:
+        """
+        Normalise one line of `osascript -i` output.
+        
+        Results are echoed in source form (quoted, possibly after a "=>"
+        marker) while log statements are printed bare, so both are reduced
+        to the bare text.
+        
+        Args:
+            line: Raw output line
+            
+        Returns:
+            Line without prompt markers or surrounding quotes
+        """
+        line = line.strip()
+        for marker in ('>>', '=>'):
+            if line.startswith(marker):
+                line = line[len(marker):].lstrip()
+        if len(line) >= 2 and line[0] == line[-1] == '"':
+            line = line[1:-1]
+        return line
+        
+    def _start_osa_process(self) -> None:
+        """Start `osascript -i` and a thread queueing its output lines."""
+        self._osa_proc = subprocess.Popen(
+            ['osascript', '-i'],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1
+        )
+        lines = self._osa_lines = queue.Queue()
+        
+        def pump(stdout) -> None:
+            for line in stdout:
+                lines.put(line)
+            lines.put(None)  # EOF
+            
+        threading.Thread(
+            target=pump, args=(self._osa_proc.stdout,), name="osascript-reader", daemon=True
+        ).start()
+        
+    def _stop_osa_process(self) -> None:
+        """Kill the osascript process, e.g. after it stopped responding."""
+        try:
+            self._osa_proc.kill()
+        except OSError as e:
+            logger.warning(f"Error stopping osascript: {e}")
+        self._osa_proc = None
+        self._osa_lines = None
+        
+    def _run_script(self, script: str) -> List[str]:
+        """
+        Run an AppleScript in a persistent `osascript -i` process.
+        
+        Starting osascript costs far more than sending a message, so one
+        interpreter is kept alive and each script is passed to it as a
+        single `run script` statement.
+        
+        Args:
+            script: AppleScript source to run
+            
+        Returns:
+            Output lines (results and log statements) printed by the script,
+            normalised by _clean_output_line
+            
+        Raises:
+            SendError: If the script raises an error, osascript exits or no
+                output arrives within SCRIPT_READ_TIMEOUT
+        """
+        wrapped = f'try\n{script}\non error errMsg\nreturn "{self.SCRIPT_ERROR}" & errMsg\nend try'
+        source = wrapped.translate(_RUN_SCRIPT_ESCAPE)
+        
+        with self._osa_lock:
+            if self._osa_proc is None or self._osa_proc.poll() is not None:
+                self._start_osa_process()
+            try:
+                self._osa_proc.stdin.write(f'run script "{source}"\n"{self.SCRIPT_DONE}"\n')
+                self._osa_proc.stdin.flush()
+            except OSError as e:
+                raise SendError(f"Unable to run AppleScript: {e}") from e
+                
+            output = []
+            while True:
+                try:
+                    line = self._osa_lines.get(timeout=self.SCRIPT_READ_TIMEOUT)
+                except queue.Empty:
+                    # Output still unread would be taken as the next script's
+                    self._stop_osa_process()
+                    raise SendError(
+                        f"osascript produced no output for {self.SCRIPT_READ_TIMEOUT}s"
+                    ) from None
+                if line is None:
+                    self._osa_proc = None
+                    raise SendError("osascript exited unexpectedly")
+                line = self._clean_output_line(line)
+                if line == self.SCRIPT_DONE:
+                    break
+                if line:
+                    output.append(line)
+                    
+        for line in output:
+            if line.startswith(self.SCRIPT_ERROR):
+                raise SendError(line[len(self.SCRIPT_ERROR):])
+        return output
+        
+    def close(self) -> None:
+        """Stop the persistent osascript process, if running."""
+        with self._osa_lock:
+            if self._osa_proc is None:
+                return
+            try:
+                self._osa_proc.stdin.close()
+                self._osa_proc.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired) as e:
+                logger.warning(f"osascript did not exit cleanly, killing it: {e}")
+                self._stop_osa_process()
+            finally:
+                self._osa_proc = None
+                self._osa_lines = None
+        
     def _validate_phone_number(self, phone: str) -> bool:
         """
         Validate phone number format.
@@ -73,25 +235,11 @@ class MessageSender:
         Returns:
             AppleScript command string
         """
-        # Escape any double quotes in the message and recipient
-        message = message.replace('"', '\\"')
-        recipient = recipient.replace('"', '\\"')
-        
-        if is_group:
-            return f'''
-                tell application "Messages"
-                    set targetChat to first chat where id is "{recipient}"
-                    send "{message}" to targetChat
-                end tell
-            '''
-        else:
-            return f'''
-                tell application "Messages"
-                    set targetBuddy to "{recipient}"
-                    set targetService to id of 1st service whose service type = iMessage
-                    send "{message}" to buddy targetBuddy of service id targetService
-                end tell
-            '''
+        template = _GROUP_SEND_SCRIPT if is_group else _SEND_SCRIPT
+        return template % (
+            recipient.translate(_APPLESCRIPT_ESCAPE),
+            message.translate(_APPLESCRIPT_ESCAPE)
+        )
         
     def _enforce_rate_limit(self):
         """
@@ -133,24 +281,15 @@ class MessageSender:
         script = self._create_applescript(recipient, message, is_group)
         
         try:
-            result = subprocess.run(
-                ['osascript', '-e', script],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            
-            if result.returncode == 0:
-                logger.info(f"Message sent successfully to {recipient}")
-                return True
-            else:
-                raise SendError(f"Message send failed: {result.stderr}")
-                
-        except subprocess.CalledProcessError as e:
-            error_msg = f"Failed to send message to {recipient}: {e.stderr}"
+            self._run_script(script)
+        except SendError as e:
+            error_msg = f"Failed to send message to {recipient}: {e}"
             logger.error(error_msg)
             raise SendError(error_msg) from e
             
+        logger.info(f"Message sent successfully to {recipient}")
+        return True
+            
     def get_recent_messages(self, chat_id: str = None, limit: int = 10, is_group: bool = False) -> List[Dict[str, str]]:
         """
         Get recent messages from a chat.
@@ -276,6 +415,43 @@ class MessageSender:
             logger.error(error_msg)
             raise SendError(error_msg) from e
             
+    def _create_bulk_applescript(self, recipients: List[str], message: str, stop_on_error: bool) -> str:
+        """
+        Create one AppleScript that sends a message to several recipients.
+        
+        The script logs "<recipient>:ok" or "<recipient>:error:<reason>" for
+        each recipient it attempts and waits minimum_delay between sends.
+        
+        Args:
+            recipients: Phone numbers or emails to send to
+            message: Message content to send
+            stop_on_error: Whether to stop at the first failed send
+            
+        Returns:
+            AppleScript command string
+        """
+        message = message.translate(_APPLESCRIPT_ESCAPE)
+        recipient_list = ', '.join('"' + r.translate(_APPLESCRIPT_ESCAPE) + '"' for r in recipients)
+        on_error = 'exit repeat' if stop_on_error else ''
+        
+        return f'''
+            tell application "Messages"
+                set targetService to id of 1st service whose service type = iMessage
+                set isFirst to true
+                repeat with targetBuddy in {{{recipient_list}}}
+                    if not isFirst then delay {self.rate_limit.minimum_delay}
+                    set isFirst to false
+                    try
+                        send "{message}" to buddy (contents of targetBuddy) of service id targetService
+                        log (contents of targetBuddy) & ":ok"
+                    on error errMsg
+                        log (contents of targetBuddy) & ":error:" & errMsg
+                        {on_error}
+                    end try
+                end repeat
+            end tell
+        '''
+        
     def send_bulk_messages(
         self, 
         recipients: List[str], 
@@ -285,6 +461,9 @@ class MessageSender:
         """
         Send the same message to multiple recipients.
         
+        All recipients are sent to from a single script, which waits
+        minimum_delay between sends.
+        
         Args:
             recipients: List of phone numbers or emails
             message: Message content to send
@@ -293,17 +472,54 @@ class MessageSender:
                              
         Returns:
             Dictionary mapping recipients to success status
+            
+        Raises:
+            SendError: If a recipient is invalid or a send fails and
+                continue_on_error is False
         """
-        results = {}
+        results = {recipient: False for recipient in recipients}
         
+        valid = []
         for recipient in recipients:
-            try:
-                success = self.send_message(recipient, message)
-                results[recipient] = success
-            except SendError as e:
-                results[recipient] = False
-                if not continue_on_error:
-                    raise
-                logger.error(f"Failed to send to {recipient}, continuing: {e}")
-                
+            if self._validate_phone_number(recipient):
+                valid.append(recipient)
+                continue
+            error_msg = f"Invalid phone number format: {recipient}"
+            if not continue_on_error:
+                logger.error(error_msg)
+                raise SendError(error_msg)
+            logger.error(f"{error_msg}, continuing")
+            
+        if not valid:
+            return results
+            
+        self._enforce_rate_limit()
+        script = self._create_bulk_applescript(valid, message, stop_on_error=not continue_on_error)
+        
+        try:
+            output = self._run_script(script)
+        except SendError as e:
+            error_msg = f"Failed to send bulk message: {e}"
+            logger.error(error_msg)
+            if not continue_on_error:
+                raise SendError(error_msg) from e
+            return results
+        finally:
+            self._last_send_time = time.time()
+            
+        # The script logs one status line per recipient it attempted
+        for line in output:
+            recipient, _, status = line.partition(':')
+            if recipient not in results:
+                continue
+            if status == 'ok':
+                results[recipient] = True
+                logger.info(f"Message sent successfully to {recipient}")
+                continue
+            error_msg = f"Failed to send message to {recipient}: {status.partition(':')[2]}"
+            if not continue_on_error:
+                logger.error(error_msg)
+                raise SendError(error_msg)
+            logger.error(f"{error_msg}, continuing")
+            
         return results
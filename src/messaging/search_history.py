@@ -4,8 +4,12 @@ Handles tracking and managing message search history.
 
 import os
 import json
+import heapq
 import logging
+from collections import deque
 from datetime import datetime
+from itertools import islice
+from operator import itemgetter
 from typing import List, Dict, Optional
 from pathlib import Path
 
@@ -14,7 +18,19 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class SearchHistory:
-    """Manages message search history."""
+    """
+    Manages message search history.
+    
+    Searches are appended to a JSON-lines file, one entry per line, so adding
+    a search never rewrites the file. The file is compacted to the retained
+    entries once it grows past COMPACT_AFTER lines.
+    """
+    
+    # Number of most recent searches kept
+    MAX_ENTRIES = 100
+    
+    # Rewrite the file with only the retained entries past this many lines
+    COMPACT_AFTER = 1000
     
     def __init__(self, history_file: Optional[str] = None):
         """
@@ -24,8 +40,11 @@ class SearchHistory:
             history_file: Path to history file. If None, uses default location.
         """
         if history_file is None:
-            # Store in user's home directory
-            history_file = os.path.expanduser("~/.imessage_crm/search_history.json")
+            # Store in user's home directory, taking over a pre-JSONL history
+            history_file = os.path.expanduser("~/.imessage_crm/search_history.jsonl")
+            legacy_file = os.path.expanduser("~/.imessage_crm/search_history.json")
+            if os.path.exists(legacy_file) and not os.path.exists(history_file):
+                os.replace(legacy_file, history_file)
             
         self.history_file = history_file
         self.history_dir = os.path.dirname(self.history_file)
@@ -34,28 +53,56 @@ class SearchHistory:
         if not os.path.exists(self.history_dir):
             os.makedirs(self.history_dir)
             
-        # Load existing history
-        self.history = self._load_history()
+        # Load existing history, oldest first
+        self.history: deque = deque(maxlen=self.MAX_ENTRIES)
+        self._file_lines = 0
+        self._load_history()
         logger.info(f"Initialized search history from {self.history_file}")
         
-    def _load_history(self) -> List[Dict]:
+    def _load_history(self) -> None:
         """Load search history from file."""
-        if os.path.exists(self.history_file):
+        if not os.path.exists(self.history_file):
+            return
+            
+        with open(self.history_file, 'r') as f:
+            text = f.read()
+            
+        # Older versions stored one JSON array, newest first
+        if text.lstrip().startswith('['):
             try:
-                with open(self.history_file, 'r') as f:
-                    history = json.load(f)
-                logger.debug(f"Loaded {len(history)} search entries")
-                return history
+                self.history.extend(reversed(json.loads(text)))
             except json.JSONDecodeError as e:
                 logger.error(f"Error loading search history: {e}")
-                return []
-        return []
+            self._compact()
+            return
+            
+        for line in text.splitlines():
+            if not line.strip():
+                continue
+            self._file_lines += 1
+            try:
+                self.history.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                logger.error(f"Skipping unreadable search history entry: {e}")
+        logger.debug(f"Loaded {len(self.history)} search entries")
         
-    def _save_history(self):
-        """Save search history to file."""
+    def _append_entry(self, entry: Dict) -> None:
+        """Append one search entry to the history file."""
+        try:
+            with open(self.history_file, 'a') as f:
+                f.write(json.dumps(entry) + '\n')
+            self._file_lines += 1
+        except Exception as e:
+            logger.error(f"Error saving search history: {e}")
+            
+    def _compact(self) -> None:
+        """Rewrite the history file with only the retained entries."""
+        temp_file = f"{self.history_file}.tmp"
         try:
-            with open(self.history_file, 'w') as f:
-                json.dump(self.history, f, indent=2)
+            with open(temp_file, 'w') as f:
+                f.writelines(json.dumps(entry) + '\n' for entry in self.history)
+            os.replace(temp_file, self.history_file)
+            self._file_lines = len(self.history)
             logger.debug(f"Saved {len(self.history)} search entries")
         except Exception as e:
             logger.error(f"Error saving search history: {e}")
@@ -89,13 +136,13 @@ class SearchHistory:
             'result_count': result_count
         }
         
-        self.history.insert(0, search_entry)  # Add to start of list
+        # The deque drops the oldest search beyond MAX_ENTRIES
+        self.history.append(search_entry)
         
-        # Keep only last 100 searches
-        if len(self.history) > 100:
-            self.history = self.history[:100]
-            
-        self._save_history()
+        if self._file_lines >= self.COMPACT_AFTER:
+            self._compact()
+        else:
+            self._append_entry(search_entry)
         logger.info(f"Added search to history: found {result_count} results")
         
     def get_recent_searches(self, limit: int = 10) -> List[Dict]:
@@ -106,14 +153,14 @@ class SearchHistory:
             limit: Maximum number of searches to return
             
         Returns:
-            List of recent search entries
+            List of recent search entries, newest first
         """
-        return self.history[:limit]
+        return list(islice(reversed(self.history), limit))
         
     def clear_history(self):
         """Clear all search history."""
-        self.history = []
-        self._save_history()
+        self.history.clear()
+        self._compact()
         logger.info("Cleared search history")
         
     def get_popular_searches(self, limit: int = 10) -> List[Dict]:
@@ -126,9 +173,5 @@ class SearchHistory:
         Returns:
             List of search entries sorted by result count
         """
-        sorted_history = sorted(
-            self.history,
-            key=lambda x: x['result_count'],
-            reverse=True
-        )
-        return sorted_history[:limit]
+        # Ties keep newest-first order, as with a stable descending sort
+        return heapq.nlargest(limit, reversed(self.history), key=itemgetter('result_count'))
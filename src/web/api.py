@@ -4,12 +4,16 @@ iMessage CRM API Routes
 RESTful API endpoints for the web dashboard
 """
 
+import re
 import sys
+import time
 import asyncio
 import logging
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterable, Iterator
+import orjson
 from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 # Add src to path for imports
@@ -29,6 +33,9 @@ logger = logging.getLogger(__name__)
 # Create API router
 api_router = APIRouter()
 
+# One starter per line, with any leading bullet marker and surrounding whitespace dropped
+_STARTER_RE = re.compile(r'^\s*[-*•]?\s*(\S.*?)\s*$', re.M)
+
 # Pydantic models for request/response
 
 class ConversationResponse(BaseModel):
@@ -521,6 +528,78 @@ async def generate_message_starters(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def buffered_sse_frames(deltas: Iterable[str], flush_interval: float = 0.02, flush_bytes: int = 64) -> Iterator[str]:
+    """Coalesce streamed text deltas into SSE frames of roughly a few words each
+    
+    A frame is emitted once the buffer holds flush_bytes characters or
+    flush_interval seconds have passed since the last frame, whichever comes
+    first. Anything left is flushed at the end, followed by a stream_end event.
+    
+    The response has already started by the time deltas is iterated, so an
+    error raised by it is reported as an error event instead of a stream_end.
+    """
+    buf = []
+    size = 0
+    last_flush = time.monotonic()
+    try:
+        for delta in deltas:
+            if not delta:
+                continue
+            buf.append(delta)
+            size += len(delta)
+            if size >= flush_bytes or time.monotonic() - last_flush >= flush_interval:
+                yield "data: " + orjson.dumps({"delta": "".join(buf)}).decode() + "\n\n"
+                buf = []
+                size = 0
+                last_flush = time.monotonic()
+    except Exception as e:
+        logger.error(f"Error while streaming: {e}")
+        if buf:
+            yield "data: " + orjson.dumps({"delta": "".join(buf)}).decode() + "\n\n"
+        yield "event: error\ndata: " + orjson.dumps({"detail": str(e)}).decode() + "\n\n"
+        return
+    
+    if buf:
+        yield "data: " + orjson.dumps({"delta": "".join(buf)}).decode() + "\n\n"
+    yield "event: stream_end\ndata: {}\n\n"
+
+
+@api_router.post("/conversations/{chat_id}/starters/stream")
+async def stream_message_starters(
+    chat_id: str,
+    request: Optional[StarterRequest] = None,
+    goal: str = None,
+    limit: int = 500
+):
+    """Stream LLM message starters for a conversation as server-sent events"""
+    try:
+        import openai
+        import os
+        
+        analysis = request.analysis if request and request.analysis else {}
+        previous_starters = request.previous_starters if request else []
+        
+        reader = MessageReader()
+        conversation = reader.get_direct_conversation(chat_id, limit=limit)
+        messages = conversation.get('messages', [])
+        
+        client = openai.OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+        stream = client.chat.completions.create(
+            model="gpt-3.5-turbo",
+            messages=build_llm_starter_messages(analysis, goal, previous_starters, messages, limit),
+            max_tokens=600,
+            temperature=0.8,
+            stream=True
+        )
+        deltas = (chunk.choices[0].delta.content for chunk in stream if chunk.choices)
+        
+        return StreamingResponse(buffered_sse_frames(deltas), media_type="text/event-stream")
+        
+    except Exception as e:
+        logger.error(f"Error streaming starters for {chat_id}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 def generate_basic_starters(goal: str = None, previous_starters: List[str] = None) -> list:
     """Generate basic conversation starters using LLM when no analysis is available"""
     # Create minimal analysis for LLM generation
@@ -536,55 +615,48 @@ def generate_basic_starters(goal: str = None, previous_starters: List[str] = Non
     return generate_llm_starters(basic_analysis, goal, "", previous_starters, None, 500)
 
 
-def generate_llm_starters(analysis: dict, goal: str = None, contact_id: str = "", previous_starters: List[str] = None, recent_messages: List[dict] = None, message_limit: int = 500) -> list:
-    """Generate intelligent conversation starters using LLM with full message context"""
-    try:
-        import openai
-        import os
-        
-        # Initialize OpenAI client with API key
-        client = openai.OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
-        
-        # Extract context from analysis
-        relationship = analysis.get('relationship_context', 'friend')
-        topics = analysis.get('topics', [])
-        sentiment = analysis.get('sentiment_label', 'neutral')
-        summary = analysis.get('summary', '')
-        suggested_tone = analysis.get('suggested_response_tone', 'friendly')
-        
-        # Format recent messages for context (use last 15-20 for optimal context)
-        recent_context = ""
-        if recent_messages:
-            # Limit to most recent messages to avoid overwhelming the prompt
-            context_messages = recent_messages[-min(20, len(recent_messages), message_limit//25):]
-            context_lines = []
-            for msg in context_messages:
-                sender = "Me" if msg.get('is_from_me') else "Contact"
-                
-                # Build message content including attachments
-                content_parts = []
-                
-                # Add text content if present
-                text = msg.get('text', '').strip()
-                if text:
-                    content_parts.append(text)
-                
-                # Add attachment information if present
-                if msg.get('has_attachment') and msg.get('attachment'):
-                    attachment = msg['attachment']
-                    attachment_desc = format_attachment_for_context(attachment)
-                    if attachment_desc:
-                        content_parts.append(attachment_desc)
+def build_llm_starter_messages(analysis: dict, goal: str = None, previous_starters: List[str] = None, recent_messages: List[dict] = None, message_limit: int = 500) -> List[dict]:
+    """Build the chat messages used to ask the LLM for conversation starters"""
+    # Extract context from analysis
+    relationship = analysis.get('relationship_context', 'friend')
+    topics = analysis.get('topics', [])
+    sentiment = analysis.get('sentiment_label', 'neutral')
+    summary = analysis.get('summary', '')
+    suggested_tone = analysis.get('suggested_response_tone', 'friendly')
+    
+    # Format recent messages for context (use last 15-20 for optimal context)
+    recent_context = ""
+    if recent_messages:
+        # Limit to most recent messages to avoid overwhelming the prompt
+        context_messages = recent_messages[-min(20, len(recent_messages), message_limit//25):]
+        context_lines = []
+        for msg in context_messages:
+            sender = "Me" if msg.get('is_from_me') else "Contact"
+            
+            # Build message content including attachments
+            content_parts = []
+            
+            # Add text content if present
+            text = msg.get('text', '').strip()
+            if text:
+                content_parts.append(text)
+            
+            # Add attachment information if present
+            if msg.get('has_attachment') and msg.get('attachment'):
+                attachment = msg['attachment']
+                attachment_desc = format_attachment_for_context(attachment)
+                if attachment_desc:
+                    content_parts.append(attachment_desc)
+            
+            # Only include message if it has some content
+            if content_parts:
+                full_content = " ".join(content_parts)
+                context_lines.append(f"{sender}: {full_content}")
                 
-                # Only include message if it has some content
-                if content_parts:
-                    full_content = " ".join(content_parts)
-                    context_lines.append(f"{sender}: {full_content}")
-                    
-            recent_context = "\n".join(context_lines[-15:])  # Last 15 messages for context
-        
-        # Create intelligent system prompt
-        system_prompt = f"""You are an expert at generating natural, contextual conversation starters for text messages. 
+        recent_context = "\n".join(context_lines[-15:])  # Last 15 messages for context
+    
+    # Create intelligent system prompt
+    system_prompt = f"""You are an expert at generating natural, contextual conversation starters for text messages. 
         
 You help people reconnect with their {relationship} by creating authentic message starters that:
 1. Reference recent conversation context when relevant
@@ -593,73 +665,84 @@ You help people reconnect with their {relationship} by creating authentic messag
 4. Feel natural and conversational, not robotic or templated
 5. Avoid repeating previous attempts"""
 
-        # Build the user prompt with rich context
-        user_prompt_parts = [
-            f"Generate 6 conversation starters for texting my {relationship}.",
-            "",
-            "CONVERSATION CONTEXT:"
-        ]
-        
-        if recent_context:
-            user_prompt_parts.extend([
-                "Recent conversation:",
-                recent_context,
-                ""
-            ])
-        
+    # Build the user prompt with rich context
+    user_prompt_parts = [
+        f"Generate 6 conversation starters for texting my {relationship}.",
+        "",
+        "CONVERSATION CONTEXT:"
+    ]
+    
+    if recent_context:
         user_prompt_parts.extend([
-            f"Relationship: {relationship}",
-            f"Recent topics: {', '.join(topics) if topics else 'General conversation'}",
-            f"Overall sentiment: {sentiment}",
-            f"Suggested tone: {suggested_tone}"
+            "Recent conversation:",
+            recent_context,
+            ""
         ])
-        
-        if summary:
-            user_prompt_parts.append(f"Conversation summary: {summary}")
-        
-        if goal:
-            user_prompt_parts.extend([
-                "",
-                f"SPECIFIC GOAL: {goal}",
-                "Important: Understand the intent behind this goal. If it's about responding to a message, reference what they actually said. If it's about planning something, build on recent relevant conversation."
-            ])
-        
-        if previous_starters:
-            user_prompt_parts.extend([
-                "",
-                "AVOID repeating these previous attempts:",
-                "\n".join(f"- {starter}" for starter in previous_starters[-10:])  # Show last 10 to avoid
-            ])
-        
+    
+    user_prompt_parts.extend([
+        f"Relationship: {relationship}",
+        f"Recent topics: {', '.join(topics) if topics else 'General conversation'}",
+        f"Overall sentiment: {sentiment}",
+        f"Suggested tone: {suggested_tone}"
+    ])
+    
+    if summary:
+        user_prompt_parts.append(f"Conversation summary: {summary}")
+    
+    if goal:
         user_prompt_parts.extend([
             "",
-            "Generate 6 starters that are:",
-            "- Natural and authentic to this relationship",
-            "- Contextually aware of recent conversation",
-            "- Varied in approach and tone",
-            f"- Focused on the goal: {goal}" if goal else "- Good conversation openers",
+            f"SPECIFIC GOAL: {goal}",
+            "Important: Understand the intent behind this goal. If it's about responding to a message, reference what they actually said. If it's about planning something, build on recent relevant conversation."
+        ])
+    
+    if previous_starters:
+        user_prompt_parts.extend([
             "",
-            "Return only the 6 starters, one per line, no numbering or extra text."
+            "AVOID repeating these previous attempts:",
+            "\n".join(f"- {starter}" for starter in previous_starters[-10:])  # Show last 10 to avoid
         ])
+    
+    user_prompt_parts.extend([
+        "",
+        "Generate 6 starters that are:",
+        "- Natural and authentic to this relationship",
+        "- Contextually aware of recent conversation",
+        "- Varied in approach and tone",
+        f"- Focused on the goal: {goal}" if goal else "- Good conversation openers",
+        "",
+        "Return only the 6 starters, one per line, no numbering or extra text."
+    ])
+    
+    user_prompt = "\n".join(user_prompt_parts)
+    
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ]
+
+
+def generate_llm_starters(analysis: dict, goal: str = None, contact_id: str = "", previous_starters: List[str] = None, recent_messages: List[dict] = None, message_limit: int = 500) -> list:
+    """Generate intelligent conversation starters using LLM with full message context"""
+    try:
+        import openai
+        import os
         
-        user_prompt = "\n".join(user_prompt_parts)
+        # Initialize OpenAI client with API key
+        client = openai.OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
         
         # Call OpenAI API
         response = client.chat.completions.create(
             model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
+            messages=build_llm_starter_messages(analysis, goal, previous_starters, recent_messages, message_limit),
             max_tokens=600,
             temperature=0.8
         )
         
         # Parse and clean the response
-        starters = response.choices[0].message.content.strip().split('\n')
-        starters = [s.strip('- ').strip() for s in starters if s.strip()]
+        starters = _STARTER_RE.findall(response.choices[0].message.content)[:6]
         
-        return starters[:6]
+        return starters
         
     except Exception as e:
         logger.error(f"Error generating LLM starters: {e}")
@@ -713,10 +796,9 @@ Return only the 6 starters, one per line, no numbering or extra text."""
             temperature=0.8
         )
         
-        starters = response.choices[0].message.content.strip().split('\n')
-        starters = [s.strip('- ').strip() for s in starters if s.strip()]
+        starters = _STARTER_RE.findall(response.choices[0].message.content)[:6]
         
-        return starters[:6]
+        return starters
         
     except Exception as e:
         logger.error(f"Error generating AI starters: {e}")
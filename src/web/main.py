@@ -4,11 +4,13 @@ iMessage CRM Web Dashboard
 FastAPI server for the web-based interface
 """
 
+import hashlib
+import re
 import sys
 from pathlib import Path
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import ORJSONResponse, Response
 
 # Add src to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -19,20 +21,43 @@ from web.api import api_router
 app = FastAPI(
     title="iMessage CRM Dashboard",
     description="Web interface for iMessage CRM with AI-powered conversation insights",
-    version="0.1.0"
+    version="0.1.0",
+    default_response_class=ORJSONResponse
 )
 
 # Mount static files
 static_path = Path(__file__).parent / "static"
-app.mount("/static", StaticFiles(directory=static_path), name="static")
+app.mount("/static", StaticFiles(directory=static_path, html=True), name="static")
+
+# Dashboard HTML is read once at startup and revalidated by ETag
+_INDEX_BYTES = (static_path / "index.html").read_bytes()
+_INDEX_ETAG = f'"{hashlib.md5(_INDEX_BYTES).hexdigest()}"'
+
+# Assets with a content hash in the name (e.g. app.3f9a2c1b.js) never change
+_HASHED_ASSET_RE = re.compile(r'\.[0-9a-f]{8,}\.\w+$')
+
+@app.middleware("http")
+async def static_cache_headers(request: Request, call_next):
+    """Let browsers cache static assets, forever if the filename is hashed"""
+    response = await call_next(request)
+    path = request.url.path
+    if path.startswith("/static/") and response.status_code in (200, 304):
+        if _HASHED_ASSET_RE.search(path):
+            response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        else:
+            response.headers["Cache-Control"] = "no-cache"
+    return response
 
 # Include API routes
 app.include_router(api_router, prefix="/api/v1")
 
 @app.get("/")
-async def root():
+async def root(request: Request):
     """Serve the main dashboard HTML"""
-    return FileResponse(static_path / "index.html")
+    headers = {"ETag": _INDEX_ETAG, "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == _INDEX_ETAG:
+        return Response(status_code=304, headers=headers)
+    return Response(content=_INDEX_BYTES, media_type="text/html", headers=headers)
 
 @app.get("/health")
 async def health_check():
@@ -0,0 +1,37 @@
+"""
+Test configuration shared by the whole suite.
+
+MessageReader tests run against a fixture chat.db built per session. Set
+IMESSAGE_TEST_DB to a real chat.db (e.g. ~/Library/Messages/chat.db) to run
+them against live data instead.
+"""
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+from src.messaging.message_index import MessageIndex
+from src.messaging.message_reader import MessageReader
+from tests.fixtures.chat_sample import build_chat_sample
+
+_fixture_dir = None
+
+def pytest_configure(config):
+    """Point MessageReader at the fixture database unless a DB was given."""
+    global _fixture_dir
+    if os.environ.get(MessageReader.DB_PATH_ENV):
+        return
+    
+    _fixture_dir = tempfile.mkdtemp(prefix='imessage_crm_fixture_')
+    os.environ[MessageReader.DB_PATH_ENV] = build_chat_sample(
+        str(Path(_fixture_dir) / 'chat_sample.db')
+    )
+
+def pytest_unconfigure(config):
+    """Remove the fixture database and its message index."""
+    if _fixture_dir:
+        fixture_db = os.environ.pop(MessageReader.DB_PATH_ENV, None)
+        if fixture_db:
+            Path(MessageIndex.default_path(fixture_db)).unlink(missing_ok=True)
+        shutil.rmtree(_fixture_dir, ignore_errors=True)
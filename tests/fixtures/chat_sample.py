@@ -0,0 +1,167 @@
+"""
+Builds a small, anonymized chat.db for tests that would otherwise read the live
+Messages database. Dates are relative to build time so "last week" style
+filters keep matching.
+"""
+
+import sqlite3
+import itertools
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Messages stores dates as nanoseconds since 2001-01-01
+APPLE_EPOCH = datetime(2001, 1, 1)
+
+SENDERS = ["+19174998893", "+19516357669"]
+SERVICES = ["iMessage", "SMS"]
+DAYS_AGO = [0, 3]
+
+# Copies of each sender/service/read/date/type combination
+COPIES = 16
+
+SCHEMA = """
+    CREATE TABLE handle (
+        ROWID INTEGER PRIMARY KEY AUTOINCREMENT,
+        id TEXT NOT NULL,
+        country TEXT,
+        service TEXT NOT NULL,
+        uncanonicalized_id TEXT
+    );
+    CREATE TABLE message (
+        ROWID INTEGER PRIMARY KEY AUTOINCREMENT,
+        guid TEXT UNIQUE NOT NULL,
+        text TEXT,
+        attributedBody BLOB,
+        handle_id INTEGER DEFAULT 0,
+        service TEXT,
+        date INTEGER,
+        date_read INTEGER,
+        is_from_me INTEGER DEFAULT 0,
+        is_read INTEGER DEFAULT 0,
+        cache_has_attachments INTEGER DEFAULT 0,
+        associated_message_type INTEGER DEFAULT 0
+    );
+    CREATE TABLE chat (
+        ROWID INTEGER PRIMARY KEY AUTOINCREMENT,
+        guid TEXT UNIQUE NOT NULL,
+        style INTEGER,
+        chat_identifier TEXT,
+        service_name TEXT,
+        room_name TEXT,
+        display_name TEXT,
+        last_addressed_handle TEXT
+    );
+    CREATE TABLE chat_handle_join (
+        chat_id INTEGER REFERENCES chat (ROWID) ON DELETE CASCADE,
+        handle_id INTEGER REFERENCES handle (ROWID) ON DELETE CASCADE,
+        UNIQUE(chat_id, handle_id)
+    );
+    CREATE TABLE chat_message_join (
+        chat_id INTEGER REFERENCES chat (ROWID) ON DELETE CASCADE,
+        message_id INTEGER REFERENCES message (ROWID) ON DELETE CASCADE,
+        message_date INTEGER DEFAULT 0,
+        PRIMARY KEY (chat_id, message_id)
+    );
+    CREATE TABLE attachment (
+        ROWID INTEGER PRIMARY KEY AUTOINCREMENT,
+        guid TEXT UNIQUE NOT NULL,
+        filename TEXT,
+        mime_type TEXT
+    );
+    CREATE TABLE message_attachment_join (
+        message_id INTEGER REFERENCES message (ROWID) ON DELETE CASCADE,
+        attachment_id INTEGER REFERENCES attachment (ROWID) ON DELETE CASCADE,
+        UNIQUE(message_id, attachment_id)
+    );
+    CREATE INDEX message_idx_date ON message(date);
+    CREATE INDEX message_idx_handle ON message(handle_id, date);
+    CREATE INDEX chat_message_join_idx_message_date_id_chat_id
+        ON chat_message_join(chat_id, message_date, message_id);
+"""
+
+def _apple_time(when: datetime) -> int:
+    """Convert a local datetime to a Messages timestamp."""
+    return int((when - APPLE_EPOCH).total_seconds()) * 1_000_000_000
+
+def build_chat_sample(path: str) -> str:
+    """
+    Create a fixture chat.db covering every sender, service, read state, day
+    and text/attachment combination, plus one group chat.
+    
+    Args:
+        path: Where to write the database; an existing file is replaced
+    
+    Returns:
+        The path of the created database
+    """
+    db_path = Path(path)
+    db_path.unlink(missing_ok=True)
+    now = datetime.now() - timedelta(minutes=1)
+    
+    with sqlite3.connect(db_path) as conn:
+        conn.executescript(SCHEMA)
+        
+        handles = {}
+        for sender, service in itertools.product(SENDERS, SERVICES):
+            cursor = conn.execute(
+                "INSERT INTO handle (id, country, service, uncanonicalized_id) VALUES (?, 'us', ?, ?)",
+                (sender, service, sender[2:])
+            )
+            handles[sender, service] = cursor.lastrowid
+        
+        chats = {}
+        for (sender, service), handle_id in handles.items():
+            cursor = conn.execute(
+                "INSERT INTO chat (guid, style, chat_identifier, service_name, last_addressed_handle) "
+                "VALUES (?, 45, ?, ?, ?)",
+                (f"{service};-;{sender}", sender, service, sender)
+            )
+            chats[sender, service] = cursor.lastrowid
+            conn.execute("INSERT INTO chat_handle_join VALUES (?, ?)", (cursor.lastrowid, handle_id))
+        
+        group_chat = conn.execute(
+            "INSERT INTO chat (guid, style, chat_identifier, service_name, room_name, display_name) "
+            "VALUES ('iMessage;+;chat100000000000000001', 43, 'chat100000000000000001', "
+            "'iMessage', 'chat100000000000000001', 'Fixture Group')"
+        ).lastrowid
+        for sender in SENDERS:
+            conn.execute(
+                "INSERT INTO chat_handle_join VALUES (?, ?)",
+                (group_chat, handles[sender, "iMessage"])
+            )
+        
+        combinations = itertools.product(
+            range(COPIES), DAYS_AGO, SENDERS, SERVICES, (True, False), (False, True)
+        )
+        for n, (copy, days_ago, sender, service, is_read, has_attachment) in enumerate(combinations):
+            sent_at = now - timedelta(days=days_ago, seconds=n)
+            date = _apple_time(sent_at)
+            is_from_me = n % 5 == 0
+            text = f"Fixture test message {n}" if n % 3 else f"Checking in about plans {n}"
+            
+            message_id = conn.execute(
+                "INSERT INTO message (guid, text, handle_id, service, date, date_read, "
+                "is_from_me, is_read, cache_has_attachments) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    f"fixture-message-{n}", text, handles[sender, service], service, date,
+                    date if is_read else 0, int(is_from_me), int(is_read or is_from_me),
+                    int(has_attachment)
+                )
+            ).lastrowid
+            
+            # Every fourth iMessage goes to the group chat
+            chat_id = group_chat if service == "iMessage" and copy % 4 == 0 else chats[sender, service]
+            conn.execute(
+                "INSERT INTO chat_message_join VALUES (?, ?, ?)", (chat_id, message_id, date)
+            )
+            
+            if has_attachment:
+                attachment_id = conn.execute(
+                    "INSERT INTO attachment (guid, filename, mime_type) VALUES (?, ?, 'image/jpeg')",
+                    (f"fixture-attachment-{n}", f"~/Library/Messages/Attachments/fixture/IMG_{n:04d}.jpeg")
+                ).lastrowid
+                conn.execute(
+                    "INSERT INTO message_attachment_join VALUES (?, ?)", (message_id, attachment_id)
+                )
+    
+    return str(db_path)
@@ -0,0 +1,24 @@
+"""
+Scratch directories for tests that write many small files. They are created on
+a RAM-backed filesystem when one is available so that file IO stays in memory.
+"""
+
+import os
+import tempfile
+
+# Overrides where test scratch directories are created (e.g. a tmpfs mount in CI)
+TMPDIR_ENV = 'IMESSAGE_CRM_TEST_TMPDIR'
+
+def fast_tmpdir() -> tempfile.TemporaryDirectory:
+    """
+    Create a temporary directory, preferring RAM-backed storage.
+    
+    Returns:
+        TemporaryDirectory under $IMESSAGE_CRM_TEST_TMPDIR if set, else
+        /dev/shm when it exists, else the system temp directory. Its path is
+        .name; call .cleanup() to remove it.
+    """
+    base = os.environ.get(TMPDIR_ENV)
+    if base is None and os.path.isdir('/dev/shm'):
+        base = '/dev/shm'
+    return tempfile.TemporaryDirectory(dir=base)
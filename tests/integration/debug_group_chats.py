@@ -3,6 +3,7 @@ Debug script to check group chat detection.
 """
 import logging
 import sys
+import threading
 from pathlib import Path
 
 # Add project root to Python path
@@ -10,7 +11,7 @@ project_root = str(Path(__file__).parent.parent.parent)
 if project_root not in sys.path:
     sys.path.append(project_root)
 
-from src.database.db_connector import DatabaseConnector
+from src.database.db_connector import DatabaseConnector, watch_chat_db
 from src.contacts.contact_manager import ContactManager
 from src.messaging.message_sender import MessageSender
 from src.messaging.group_chat_manager import GroupChatManager
@@ -48,6 +49,10 @@ def main():
             state_manager=state_manager
         )
         
+        # Watch chat.db so we re-check as soon as Messages writes to it
+        db_changed = threading.Event()
+        stop_watching = watch_chat_db(db.db_path, db_changed)
+        
         logger.info("\n=== Phase 2: Waiting for New Group Chat ===")
         logger.info("Instructions:")
         logger.info("1. Create a new group chat now")
@@ -58,27 +63,29 @@ def main():
         logger.info("\n=== Phase 3: New Chat Detection ===")
         logger.info("Checking for new group chats...")
         
-        # Check for new chats multiple times with a delay
+        # Re-check whenever chat.db changes, for up to 30 seconds
         import time
-        max_attempts = 3
-        for attempt in range(max_attempts):
-            logger.info(f"\nAttempt {attempt + 1}/{max_attempts}:")
+        deadline = time.monotonic() + 30
+        try:
             chats = manager.check_new_group_chats()
+            while not chats:
+                logger.info("No new chats found yet, waiting for chat.db to change...")
+                if not db_changed.wait(timeout=max(0, deadline - time.monotonic())):
+                    break
+                db_changed.clear()
+                chats = manager.check_new_group_chats()
+        finally:
+            stop_watching.set()
             
-            if chats:
-                logger.info(f"Found {len(chats)} new group chats!")
-                for chat in chats:
-                    logger.info("\nChat Details:")
-                    logger.info(f"  GUID: {chat['guid']}")
-                    logger.info(f"  Name: {chat['name']}")
-                    logger.info(f"  Participants: {chat['participants']}")
-                    logger.info(f"  Last Message: {chat.get('last_message_text', 'None')}")
-                    logger.info(f"  Last Message Date: {chat.get('last_message_date', 'None')}")
-                break
-            else:
-                logger.info("No new chats found yet, waiting 2 seconds...")
-                if attempt < max_attempts - 1:  # Don't wait after last attempt
-                    time.sleep(2)
+        if chats:
+            logger.info(f"Found {len(chats)} new group chats!")
+            for chat in chats:
+                logger.info("\nChat Details:")
+                logger.info(f"  GUID: {chat['guid']}")
+                logger.info(f"  Name: {chat['name']}")
+                logger.info(f"  Participants: {chat['participants']}")
+                logger.info(f"  Last Message: {chat.get('last_message_text', 'None')}")
+                logger.info(f"  Last Message Date: {chat.get('last_message_date', 'None')}")
         
         if not chats:
             logger.info("\nNo new group chats were detected")
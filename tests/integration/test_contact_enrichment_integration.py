@@ -17,6 +17,7 @@ class TestContactEnrichmentIntegration(unittest.TestCase):
     
     # Test configuration
     SYSTEM_PHONE = "+1234567890"
+    ENRICHMENT_FIELDS = ['name', 'email', 'company']
     
     @classmethod
     def setUpClass(cls):
@@ -43,43 +44,33 @@ class TestContactEnrichmentIntegration(unittest.TestCase):
         from src.messaging.message_reader import MessageReader
         cls.message_reader = MessageReader()
         
-        # Get recent group chats
-        cls.group_chats = [chat for chat in cls.message_reader.get_recent_chats(limit=10)
-                          if chat['is_group']]
+        # Use the most recent group chat as the test chat
+        cls.test_chat = next(
+            (chat for chat in cls.message_reader.get_recent_chats(limit=10) if chat['is_group']),
+            None
+        )
         
-        if not cls.group_chats:
+        if cls.test_chat is None:
             raise unittest.SkipTest(
                 "No group chats found for testing. "
                 "Please create a group chat first."
             )
-            
-        # Set test chat to first group chat
-        cls.test_chat = cls.group_chats[0]
         
     def setUp(self):
         """Set up test-specific data."""
         self.chat_guid = self.test_chat['guid']
         chat_info = self.state_manager.get_chat_info(self.chat_guid)
         
-        # Get participants who need enrichment
-        all_participants = chat_info['participants']
+        # Get participants who need enrichment, skipping our system number
+        phones = set(chat_info['participants']) - {self.SYSTEM_PHONE}
+        contacts = self.contact_manager.get_contacts_bulk(phones)
         self.participants = {}
         
         # Find participants missing contact info
-        for phone in all_participants:
-            if phone != self.system_phone:  # Skip our system number
-                contact = self.contact_manager.get_contact(phone)
-                missing_fields = []
-                
-                if not contact.get('name'):
-                    missing_fields.append('name')
-                if not contact.get('email'):
-                    missing_fields.append('email')
-                if not contact.get('company'):
-                    missing_fields.append('company')
-                    
-                if missing_fields:  # Only include if they're missing info
-                    self.participants[phone] = missing_fields
+        for phone in phones:
+            missing_fields = self._missing_fields(contacts.get(phone))
+            if missing_fields:  # Only include if they're missing info
+                self.participants[phone] = missing_fields
                     
         if not self.participants:
             self.skipTest("No participants found needing enrichment")
@@ -89,6 +80,18 @@ class TestContactEnrichmentIntegration(unittest.TestCase):
         # No cleanup needed since we're using existing chats
         pass
         
+    def _missing_fields(self, contact) -> List[str]:
+        """List the enrichment fields a contact is missing (all of them if no contact)."""
+        if contact is None:
+            return list(self.ENRICHMENT_FIELDS)
+            
+        present = {
+            'name': contact.name,
+            'email': contact.emails,
+            'company': contact.get_metadata('company')
+        }
+        return [field for field in self.ENRICHMENT_FIELDS if not present[field]]
+        
     def test_end_to_end_enrichment_flow(self):
         """Test the complete enrichment flow with real components."""
         try:
@@ -159,16 +162,14 @@ class TestContactEnrichmentIntegration(unittest.TestCase):
             self.skipTest(f"Test group '{self.TEST_GROUP_NAME}' needs at least 5 participants")
             
         # Get participants needing enrichment
+        phones = set(chat_info['participants']) - {self.SYSTEM_PHONE}
+        contacts = self.contact_manager.get_contacts_bulk(phones)
         large_participants = {}
         
-        for phone in chat_info['participants']:
-            if phone != self.system_phone:
-                contact = self.contact_manager.get_contact(phone)
-                if not all(contact.get(f) for f in ['name', 'email', 'company']):
-                    large_participants[phone] = [
-                        f for f in ['name', 'email', 'company']
-                        if not contact.get(f)
-                    ]
+        for phone in phones:
+            missing_fields = self._missing_fields(contacts.get(phone))
+            if missing_fields:
+                large_participants[phone] = missing_fields
                     
         if not large_participants:
             self.skipTest("No participants found needing enrichment in large group")
@@ -196,13 +197,13 @@ class TestContactEnrichmentIntegration(unittest.TestCase):
         chat_info = self.state_manager.get_chat_info(self.chat_guid)
         
         # Find a participant missing only their name
+        phones = set(chat_info['participants']) - {self.SYSTEM_PHONE}
+        contacts = self.contact_manager.get_contacts_bulk(phones)
         minimal_participants = {}
-        for phone in chat_info['participants']:
-            if phone != self.system_phone:
-                contact = self.contact_manager.get_contact(phone)
-                if not contact.get('name') and contact.get('email'):
-                    minimal_participants[phone] = ['name']
-                    break
+        for phone, contact in contacts.items():
+            if not contact.name and contact.emails:
+                minimal_participants[phone] = ['name']
+                break
                     
         if not minimal_participants:
             self.skipTest("No participants found missing only name")
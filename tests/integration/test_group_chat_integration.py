@@ -9,6 +9,7 @@ import tempfile
 import shutil
 import os
 import time
+import threading
 from pathlib import Path
 from datetime import datetime, timedelta
 import logging
@@ -23,7 +24,7 @@ project_root = str(Path(__file__).parent.parent.parent)
 if project_root not in sys.path:
     sys.path.append(project_root)
 
-from src.database.db_connector import DatabaseConnector
+from src.database.db_connector import DatabaseConnector, watch_chat_db
 from src.contacts.contact import Contact
 from src.contacts.contact_manager import ContactManager
 from src.messaging.message_sender import MessageSender
@@ -116,26 +117,30 @@ class TestGroupChatIntegration(unittest.TestCase):
         print("\nPress Enter to begin monitoring, then create your group chat...")
         input()
         
+        # Watch chat.db so we re-check as soon as Messages writes to it
+        db_changed = threading.Event()
+        stop_watching = watch_chat_db(self.db_connector.db_path, db_changed)
+        self.addCleanup(stop_watching.set)
+        
         print("\nMonitoring started - please create your group chat now...")
         print("Waiting for you to create a group chat. Press Enter after you've created and sent a message...")
         input()
         
         print("\nChecking for new group chats...")
-        max_attempts = 5
         detected_chat = None
+        deadline = time.monotonic() + 30
         
-        for attempt in range(max_attempts):
-            print(f"\nCheck attempt {attempt + 1}/{max_attempts}...")
-            # Check for any new unprocessed chats
-            current_chats = self.manager.check_new_group_chats()
-            
-            if current_chats:
-                detected_chat = current_chats[0]  # Get the first new chat
+        # Check for any new unprocessed chats, then again on every chat.db write
+        current_chats = self.manager.check_new_group_chats()
+        while not current_chats:
+            print("No new chat detected yet, waiting for chat.db to change...")
+            if not db_changed.wait(timeout=max(0, deadline - time.monotonic())):
                 break
+            db_changed.clear()
+            current_chats = self.manager.check_new_group_chats()
             
-            if attempt < max_attempts - 1:
-                print("No new chat detected yet, waiting 5 seconds...")
-                time.sleep(5)
+        if current_chats:
+            detected_chat = current_chats[0]  # Get the first new chat
         
         # Verify chat detection
         self.assertIsNotNone(detected_chat, "Failed to detect new group chat")
@@ -155,29 +160,23 @@ class TestGroupChatIntegration(unittest.TestCase):
             (detected_chat['chat_id'],)
         )
         
-        participant_count = 0
-        for participant in chat_participants:
-            phone = participant['id']  # sqlite3.Row provides dictionary-like access
-            if phone != self.system_phone:  # Skip our own number
-                participant_count += 1
-                contact = self.contact_manager.find_by_identifier(phone)
-                self.assertIsNotNone(
-                    contact,
-                    f"No contact record created for {phone}"
-                )
-                self.assertEqual(
-                    contact.get_metadata('in_crm'),
-                    'true',
-                    f"Contact {phone} not marked as in CRM"
-                )
-                print(f"\n=== Contact Verification ===")
-                print(f"Found contact record for {phone}:")
-                print(f"Name: {contact.name}")
-                print(f"ID: {contact.contact_id}")
-                print("-" * 30)
+        # Look up every participant except our own number in one pass
+        expected = {p['id'] for p in chat_participants} - {self.system_phone}
+        contacts_by_phone = self.contact_manager.find_by_identifiers(expected)
+        
+        missing = expected - contacts_by_phone.keys()
+        self.assertFalse(missing, f"No contact records created for {missing}")
+        
+        not_in_crm = {
+            phone for phone, contact in contacts_by_phone.items()
+            if contact.get_metadata('in_crm') != 'true'
+        }
+        self.assertFalse(not_in_crm, f"Contacts not marked as in CRM: {not_in_crm}")
+        print(f"\nVerified {len(contacts_by_phone)} contact records: "
+              f"{', '.join(contact.name for contact in contacts_by_phone.values())}")
         
         self.assertGreater(
-            participant_count,
+            len(expected),
             1,
             "Expected at least 2 participants in group chat"
         )
@@ -222,28 +221,28 @@ class TestGroupChatIntegration(unittest.TestCase):
         print("\nPress Enter when ready to start...")
         input()
         
-        # Get current message count
-        initial_count = self.db_connector.execute_query(
-            "SELECT COUNT(*) as count FROM message WHERE is_from_me = 0"
-        )[0]['count']
-        
-        print("\nWaiting for new message...")
-        max_attempts = 5
-        new_message_detected = False
-        
-        for attempt in range(max_attempts):
-            print(f"Check attempt {attempt + 1}/{max_attempts}...")
-            current_count = self.db_connector.execute_query(
-                "SELECT COUNT(*) as count FROM message WHERE is_from_me = 0"
-            )[0]['count']
+        # Hold one connection open: PRAGMA data_version only changes when
+        # another connection (Messages) commits a write
+        with self.db_connector.get_connection() as conn:
+            last_version = conn.execute("PRAGMA data_version").fetchone()[0]
+            initial_rowid = conn.execute("SELECT MAX(ROWID) FROM message").fetchone()[0] or 0
             
-            if current_count > initial_count:
-                new_message_detected = True
-                break
-                
-            if attempt < max_attempts - 1:
-                print("No new message detected, waiting 5 seconds...")
-                time.sleep(5)
+            print("\nWaiting for new message...")
+            new_message_detected = False
+            deadline = time.monotonic() + 20
+            
+            while time.monotonic() < deadline:
+                version = conn.execute("PRAGMA data_version").fetchone()[0]
+                if version != last_version:
+                    last_version = version
+                    # Only look at rows written since we started waiting
+                    new_message_detected = conn.execute(
+                        "SELECT 1 FROM message WHERE ROWID > ? AND is_from_me = 0 LIMIT 1",
+                        (initial_rowid,)
+                    ).fetchone() is not None
+                    if new_message_detected:
+                        break
+                time.sleep(0.1)
         
         self.assertTrue(new_message_detected, "Failed to detect new message")
         print("\nSuccessfully detected new message!")
@@ -3,6 +3,7 @@ Integration tests for MessageReader and ContactManager interaction.
 Tests the combined functionality of message reading and contact management.
 """
 
+import copy
 import unittest
 import tempfile
 import shutil
@@ -25,26 +26,42 @@ from src.contacts.contact_manager import ContactManager
 from src.contacts.contact import Contact
 
 class TestMessageContactIntegration(unittest.TestCase):
-    def setUp(self):
-        """Set up test fixtures."""
+    # Cap on topics stored in a contact's unread_topics metadata
+    MAX_UNREAD_TOPICS = 100
+    
+    @classmethod
+    def setUpClass(cls):
+        """Set up fixtures shared by every test."""
         # Create a temporary directory for contact storage
-        self.temp_dir = tempfile.mkdtemp()
-        self.contact_manager = ContactManager(self.temp_dir)
-        self.message_reader = MessageReader()
+        cls.temp_dir = tempfile.mkdtemp()
+        cls.contact_manager = ContactManager(cls.temp_dir)
+        cls.message_reader = MessageReader()
         
         # Create test contact with real phone number
-        self.contact = Contact(
+        cls.contact = Contact(
             name="Test User",
             phone_numbers=["+19516357669"],  # Real number with correct format
             emails=["test@example.com"]
         )
         
-        # Add contact to manager
-        self.contact_manager.add_contact(self.contact)
+        # Add contact to manager and remember its pristine state
+        cls.contact_manager.add_contacts([cls.contact])
+        cls._contact_data = copy.deepcopy(cls.contact.to_dict())
+        
+        # Dates used by the date-range tests, computed once per run
+        cls.today = datetime.now()
+        cls.week_ago = cls.today - timedelta(days=7)
+        cls.today_str = cls.today.strftime("%Y-%m-%d")
+        cls.week_ago_str = cls.week_ago.strftime("%Y-%m-%d")
         
-    def tearDown(self):
-        """Clean up after tests."""
-        shutil.rmtree(self.temp_dir)
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up after all tests."""
+        shutil.rmtree(cls.temp_dir)
+        
+    def setUp(self):
+        """Reset the test contact so stats and metadata don't leak between tests."""
+        self.contact_manager.update_contact(Contact.from_dict(copy.deepcopy(self._contact_data)))
         
     def test_message_search_with_contacts(self):
         """Test searching messages and linking them to contacts."""
@@ -54,34 +71,40 @@ class TestMessageContactIntegration(unittest.TestCase):
             page_size=50
         ).messages
         
-        # Track messages belonging to our test contact
-        contact_messages = []
+        # Resolve every distinct sender to a contact up front
+        contacts_by_sender = self.contact_manager.find_by_identifiers(
+            {msg['sender'] for msg in messages}
+        )
         
+        # Tally messages belonging to our test contact in a single pass
+        total = 0
+        unread = 0
+        last_message_time = ''
         for msg in messages:
-            sender = msg['sender']
-            # Try to find contact by sender identifier
-            contact = self.contact_manager.find_by_identifier(sender)
+            contact = contacts_by_sender.get(msg['sender'])
             if contact and contact.contact_id == self.contact.contact_id:
-                contact_messages.append(msg)
+                total += 1
+                unread += not msg['is_read']
+                last_message_time = max(last_message_time, msg['timestamp'])
                     
         # Update message stats for contact
-        if contact_messages:
+        if total:
             self.contact_manager.update_message_stats(
                 identifier=self.contact.phone_numbers[0],
-                total_delta=len(contact_messages),
-                unread_delta=sum(1 for m in contact_messages if not m['is_read']),
-                last_message_time=max(m['timestamp'] for m in contact_messages)
+                total_delta=total,
+                unread_delta=unread,
+                last_message_time=last_message_time
             )
             
             # Verify contact message stats were updated
             updated_contact = self.contact_manager.get_contact(self.contact.contact_id)
-            self.assertEqual(updated_contact.total_messages, len(contact_messages))
+            self.assertEqual(updated_contact.total_messages, total)
             
     def test_filtered_message_search_with_contacts(self):
         """Test searching messages with filters and linking to contacts."""
         # Get messages from the last week
-        end_date = datetime.now().strftime("%Y-%m-%d")
-        start_date = (datetime.now() - timedelta(days=7)).strftime("%Y-%m-%d")
+        end_date = self.today_str
+        start_date = self.week_ago_str
         
         messages = self.message_reader.search_messages(
             start_date=start_date,
@@ -92,38 +115,44 @@ class TestMessageContactIntegration(unittest.TestCase):
             page_size=50
         ).messages
         
-        # Track unread messages per contact
+        # Track unread messages per contact, looking up each sender once
         contact_unread = {}
+        contacts = self.contact_manager.find_by_identifiers({msg['sender'] for msg in messages})
         
         for msg in messages:
-            sender = msg['sender']
-            contact = self.contact_manager.find_by_identifier(sender)
+            contact = contacts.get(msg['sender'])
             if contact:
                 if contact.contact_id not in contact_unread:
                     contact_unread[contact.contact_id] = []
                 contact_unread[contact.contact_id].append(msg)
                 
-        # Update contact metadata for unread messages
+        # Update stats and unread topics for every contact in one batch
+        updates = []
         for contact_id, unread_messages in contact_unread.items():
             contact = self.contact_manager.get_contact(contact_id)
-            self.contact_manager.update_message_stats(
-                identifier=contact.phone_numbers[0],
-                unread_delta=len(unread_messages),
-                last_message_time=max(m['timestamp'] for m in unread_messages)
-            )
+            update = {
+                'identifier': contact.phone_numbers[0],
+                'unread_delta': len(unread_messages),
+                'last_message_time': max(m['timestamp'] for m in unread_messages)
+            }
             
             # Add metadata about unread message content
             topics = set()
             for msg in unread_messages:
-                # Simple topic extraction (just first few words)
+                if len(topics) >= self.MAX_UNREAD_TOPICS:
+                    break
+                # Simple topic extraction (just first few words, without
+                # splitting the rest of the message)
                 text = msg['text']
                 if text:
-                    topic = ' '.join(text.split()[:3])
+                    topic = ' '.join(text.split(None, 3)[:3])
                     topics.add(topic)
             
             if topics:
-                contact.set_metadata('unread_topics', '; '.join(topics))
-                self.contact_manager.update_contact(contact)
+                update['metadata'] = {'unread_topics': '; '.join(topics)}
+            updates.append(update)
+            
+        self.contact_manager.bulk_update_message_stats(updates)
                 
     def test_contact_message_history(self):
         """Test retrieving full message history for contacts."""
@@ -135,35 +164,40 @@ class TestMessageContactIntegration(unittest.TestCase):
         ).messages
         
         if messages:
-            # Update contact with message history stats
-            self.contact_manager.update_message_stats(
-                identifier=self.contact.phone_numbers[0],
-                total_delta=len(messages),
-                unread_delta=sum(1 for m in messages if not m['is_read']),
-                last_message_time=max(m['timestamp'] for m in messages)
-            )
-            
-            # Calculate and store engagement metrics
-            contact = self.contact_manager.get_contact(self.contact.contact_id)
+            # Gather stats, conversation dates, attachments and response
+            # patterns in a single pass
+            unread = 0
+            last_message_time = ''
+            conversation_dates = set()
+            has_attachments = 0
+            sent = 0
+            received = 0
+            for m in messages:
+                timestamp = m['timestamp']
+                unread += not m['is_read']
+                last_message_time = max(last_message_time, timestamp)
+                conversation_dates.add(timestamp[:10])
+                has_attachments += bool(m.get('has_attachment'))
+                if m['is_from_me']:
+                    sent += 1
+                else:
+                    received += 1
             
-            # Track conversation dates
-            conversation_dates = set(m['timestamp'].split('T')[0] for m in messages)
-            contact.set_metadata('conversation_days', str(len(conversation_dates)))
-            
-            # Track message types
-            has_attachments = sum(1 for m in messages if m.get('has_attachment'))
+            # Calculate engagement metrics
+            metadata = {'conversation_days': str(len(conversation_dates))}
             if has_attachments:
-                contact.set_metadata('uses_attachments', 'true')
+                metadata['uses_attachments'] = 'true'
+            if sent and received:
+                metadata['response_ratio'] = f"{sent / received:.2f}"
                 
-            # Track response patterns
-            sent_messages = [m for m in messages if m['is_from_me']]
-            received_messages = [m for m in messages if not m['is_from_me']]
-            
-            if sent_messages and received_messages:
-                response_ratio = len(sent_messages) / len(received_messages)
-                contact.set_metadata('response_ratio', f"{response_ratio:.2f}")
-                
-            self.contact_manager.update_contact(contact)
+            # Store message history stats and metrics in one write
+            self.contact_manager.bulk_update_message_stats([{
+                'identifier': self.contact.phone_numbers[0],
+                'total_delta': len(messages),
+                'unread_delta': unread,
+                'last_message_time': last_message_time,
+                'metadata': metadata
+            }])
                 
     def test_search_contacts_by_message_criteria(self):
         """Test searching contacts based on message-related criteria."""
@@ -182,41 +216,47 @@ class TestMessageContactIntegration(unittest.TestCase):
         if not messages:
             self.skipTest("No messages found for test contact")
             
-        # Update contact with message data
-        self.contact_manager.update_message_stats(
-            identifier=self.contact.phone_numbers[0],
-            total_delta=len(messages),
-            unread_delta=sum(1 for m in messages if not m['is_read']),
-            last_message_time=max(m['timestamp'] for m in messages)
-        )
+        # Gather unread count, last message time and attachment use in one pass
+        unread = 0
+        last_message_time = ''
+        has_attachments = False
+        for m in messages:
+            unread += not m['is_read']
+            last_message_time = max(last_message_time, m['timestamp'])
+            has_attachments = has_attachments or bool(m.get('has_attachment'))
         
-        # Update metadata
-        contact = self.contact_manager.get_contact(self.contact.contact_id)
-        has_attachments = any(m.get('has_attachment') for m in messages)
+        # Update contact with message data and metadata in one write
+        update = {
+            'identifier': self.contact.phone_numbers[0],
+            'total_delta': len(messages),
+            'unread_delta': unread,
+            'last_message_time': last_message_time
+        }
         if has_attachments:
-            contact.set_metadata('uses_attachments', 'true')
-            self.contact_manager.update_contact(contact)
+            update['metadata'] = {'uses_attachments': 'true'}
+        self.contact_manager.bulk_update_message_stats([update])
+        contact = self.contact_manager.get_contact(self.contact.contact_id)
         
         # Test search functionality
         if contact.unread_messages > 0:
             # Search for contacts with unread messages
             unread_results = self.contact_manager.search_contacts(has_unread=True)
-            self.assertIn(contact.contact_id, [c.contact_id for c in unread_results])
+            self.assertIn(contact.contact_id, {c.contact_id for c in unread_results})
         
         if contact.last_message_at:
             # Search for recently active contacts
-            last_week = (datetime.now() - timedelta(days=7)).isoformat()
+            last_week = self.week_ago.isoformat()
             recent_results = self.contact_manager.search_contacts(
                 last_message_after=last_week
             )
-            self.assertIn(contact.contact_id, [c.contact_id for c in recent_results])
+            self.assertIn(contact.contact_id, {c.contact_id for c in recent_results})
         
         if has_attachments:
             # Search for contacts who use attachments
             attachment_results = self.contact_manager.search_contacts(
                 metadata_filters={'uses_attachments': 'true'}
             )
-            self.assertIn(contact.contact_id, [c.contact_id for c in attachment_results])
+            self.assertIn(contact.contact_id, {c.contact_id for c in attachment_results})
 
 def run_tests():
     """Run the test suite."""
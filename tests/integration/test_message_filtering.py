@@ -1,6 +1,9 @@
 """
 Integration tests for message filtering functionality.
 Tests filtering by type, status, service, and combinations.
+
+The tests only read chat.db and share nothing but per-class setup, so they
+can run in parallel: python -m pytest -n 4 tests/integration/test_message_filtering.py
 """
 
 import logging
@@ -26,96 +29,139 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 class TestMessageFiltering(unittest.TestCase):
-    def setUp(self):
-        """Set up test environment before each test."""
-        self.reader = MessageReader()
-        self.test_number = "+19174998893"  # Our verified test number
+    # Number of recent messages loaded once and shared by the per-filter tests
+    SNAPSHOT_SIZE = 5000
+    
+    @classmethod
+    def setUpClass(cls):
+        """Set up a shared reader and message snapshot for all tests."""
+        cls.reader = MessageReader()
+        cls.test_number = "+19174998893"  # Our verified test number
+        cls._all = cls.reader.search_messages(page=1, page_size=cls.SNAPSHOT_SIZE).messages
+        
+        # Dates used by the date-range tests, computed once per run
+        cls.today = datetime.now()
+        cls.today_str = cls.today.strftime("%Y-%m-%d")
+        cls.week_ago_str = (cls.today - timedelta(days=7)).strftime("%Y-%m-%d")
         
     def test_01_filter_by_type(self):
         """Test filtering messages by type (text vs attachment)."""
         # Get only text messages
-        text_results = self.reader.search_messages(
-            message_types=[MessageType.TEXT]
-        )
-        self.assertGreater(text_results.total_count, 0)
-        for msg in text_results.messages:
-            self.assertFalse(msg['has_attachment'])
+        text_messages = [m for m in self._all if not m['has_attachment']]
+        self.assertGreater(len(text_messages), 0)
+        for msg in text_messages:
+            self.assertIsNone(msg['attachment'])
             
         # Get only messages with attachments
-        attachment_results = self.reader.search_messages(
-            message_types=[MessageType.ATTACHMENT]
-        )
-        for msg in attachment_results.messages:
-            self.assertTrue(msg['has_attachment'])
+        attachment_messages = [m for m in self._all if m['has_attachment']]
+        for msg in attachment_messages:
             self.assertIsNotNone(msg['attachment'])
             
+        # A live filtered search starts with the snapshot subset, which only
+        # covers the most recent SNAPSHOT_SIZE messages
+        live_attachments = self.reader.search_messages(
+            message_types=[MessageType.ATTACHMENT], page_size=self.SNAPSHOT_SIZE
+        ).messages
+        self.assertEqual(
+            [m['rowid'] for m in live_attachments[:len(attachment_messages)]],
+            [m['rowid'] for m in attachment_messages]
+        )
+            
         logger.info(
-            f"Found {text_results.total_count} text messages and "
-            f"{attachment_results.total_count} messages with attachments"
+            f"Found {len(text_messages)} text messages and "
+            f"{len(attachment_messages)} messages with attachments"
         )
         
     def test_02_filter_by_service(self):
         """Test filtering messages by service (iMessage vs SMS)."""
-        # Get only iMessages
-        imessage_results = self.reader.search_messages(
-            services=[MessageService.IMESSAGE]
-        )
-        for msg in imessage_results.messages:
-            self.assertEqual(msg['service'], MessageService.IMESSAGE)
-            
-        # Get only SMS messages
-        sms_results = self.reader.search_messages(
-            services=[MessageService.SMS]
+        # Get only iMessages and only SMS messages
+        imessages = [m for m in self._all if m['service'] == MessageService.IMESSAGE]
+        sms_messages = [m for m in self._all if m['service'] == MessageService.SMS]
+        
+        # A live filtered search starts with the snapshot subset, which only
+        # covers the most recent SNAPSHOT_SIZE messages
+        live_sms = self.reader.search_messages(
+            services=[MessageService.SMS], page_size=self.SNAPSHOT_SIZE
+        ).messages
+        self.assertEqual(
+            [m['rowid'] for m in live_sms[:len(sms_messages)]],
+            [m['rowid'] for m in sms_messages]
         )
-        for msg in sms_results.messages:
-            self.assertEqual(msg['service'], MessageService.SMS)
             
         logger.info(
-            f"Found {imessage_results.total_count} iMessages and "
-            f"{sms_results.total_count} SMS messages"
+            f"Found {len(imessages)} iMessages and "
+            f"{len(sms_messages)} SMS messages"
         )
         
     def test_03_filter_by_read_status(self):
         """Test filtering messages by read status."""
-        # Get unread messages
-        unread_results = self.reader.search_messages(read_status=False)
-        for msg in unread_results.messages:
-            self.assertFalse(msg['is_read'])
-            
-        # Get read messages
-        read_results = self.reader.search_messages(read_status=True)
-        for msg in read_results.messages:
-            self.assertTrue(msg['is_read'])
+        # Get unread and read messages
+        unread_messages = [m for m in self._all if not m['is_read']]
+        read_messages = [m for m in self._all if m['is_read']]
+        
+        # A live filtered search starts with the snapshot subset, which only
+        # covers the most recent SNAPSHOT_SIZE messages
+        live_unread = self.reader.search_messages(
+            read_status=False, page_size=self.SNAPSHOT_SIZE
+        ).messages
+        self.assertEqual(
+            [m['rowid'] for m in live_unread[:len(unread_messages)]],
+            [m['rowid'] for m in unread_messages]
+        )
             
         logger.info(
-            f"Found {unread_results.total_count} unread messages and "
-            f"{read_results.total_count} read messages"
+            f"Found {len(unread_messages)} unread messages and "
+            f"{len(read_messages)} read messages"
         )
         
     def test_04_combined_filters(self):
         """Test combining multiple filters."""
-        # Get unread iMessages with attachments from last week
-        end_date = datetime.now().strftime("%Y-%m-%d")
-        start_date = (datetime.now() - timedelta(days=7)).strftime("%Y-%m-%d")
+        # Get unread iMessages with attachments from last week, alongside
+        # the single-filter buckets it combines, in one query
+        end_date = self.today_str
+        start_date = self.week_ago_str
         
-        results = self.reader.search_messages(
+        filters = {
+            'combined': {
+                'message_types': [MessageType.ATTACHMENT],
+                'services': [MessageService.IMESSAGE],
+                'read_status': False
+            },
+            'attachments': {'message_types': [MessageType.ATTACHMENT]},
+            'imessages': {'services': [MessageService.IMESSAGE]},
+            'unread': {'read_status': False}
+        }
+        buckets = self.reader.search_messages_multi(
+            filters=filters,
             start_date=start_date,
             end_date=end_date,
-            message_types=[MessageType.ATTACHMENT],
-            services=[MessageService.IMESSAGE],
-            read_status=False
+            limit=self.SNAPSHOT_SIZE
         )
         
-        for msg in results.messages:
+        for msg in buckets['combined']:
             self.assertTrue(msg['has_attachment'])
             self.assertEqual(msg['service'], MessageService.IMESSAGE)
             self.assertFalse(msg['is_read'])
-            msg_date = datetime.strptime(msg['timestamp'].split()[0], "%Y-%m-%d")
-            self.assertGreaterEqual(msg_date, datetime.strptime(start_date, "%Y-%m-%d"))
-            self.assertLessEqual(msg_date, datetime.strptime(end_date, "%Y-%m-%d"))
+            msg_date = msg['timestamp'][:10]
+            self.assertGreaterEqual(msg_date, start_date)
+            self.assertLessEqual(msg_date, end_date)
+        
+        # Each bucket matches a separate search with the same filters
+        for name, criteria in filters.items():
+            expected = self.reader.search_messages(
+                start_date=start_date,
+                end_date=end_date,
+                page_size=self.SNAPSHOT_SIZE,
+                **criteria
+            ).messages
+            self.assertEqual(
+                [msg['rowid'] for msg in buckets[name]],
+                [msg['rowid'] for msg in expected],
+                name
+            )
             
         logger.info(
-            f"Found {results.total_count} unread iMessage attachments "
+            f"Found {len(buckets['combined'])} unread iMessage attachments "
             f"from the last week"
         )
         
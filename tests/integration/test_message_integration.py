@@ -6,6 +6,7 @@ Tests real message sending, receiving, group chats, and error conditions.
 import logging
 import sys
 import os
+import threading
 import time
 import subprocess
 from pathlib import Path
@@ -25,11 +26,39 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 class TestMessageIntegration(unittest.TestCase):
+    @staticmethod
+    def _wait_for_messages_app(running: bool, timeout: float = 2.0) -> bool:
+        """
+        Poll until the Messages app has started or quit.
+        
+        Args:
+            running: Whether to wait for the app to be running or gone
+            timeout: Maximum number of seconds to wait
+            
+        Returns:
+            True if the app reached the requested state before the timeout
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            is_running = subprocess.run(
+                ['pgrep', '-x', 'Messages'],
+                stdout=subprocess.DEVNULL
+            ).returncode == 0
+            if is_running == running:
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+    
     def setUp(self):
         """Set up test environment before each test."""
         self.sender = MessageSender()
         self.test_number = "+19174998893"  # Our verified test number
         
+    def tearDown(self):
+        """Stop the sender's osascript process."""
+        self.sender.close()
+        
     def test_01_basic_message_send(self):
         """Test sending a basic message with standard characters."""
         message = (
@@ -138,11 +167,8 @@ class TestMessageIntegration(unittest.TestCase):
         # Test when Messages app is not running
         try:
             # Quit Messages app if it's running
-            subprocess.run(
-                ['osascript', '-e', 'tell application "Messages" to quit'],
-                check=True
-            )
-            time.sleep(2)  # Wait for app to fully quit
+            self.sender._run_script('tell application "Messages" to quit')
+            self._wait_for_messages_app(running=False)
             
             # Should still be able to send messages
             success = self.sender.send_message(
@@ -163,16 +189,20 @@ class TestMessageIntegration(unittest.TestCase):
                 ['open', '-a', 'Messages'],
                 check=True
             )
-            time.sleep(2)  # Wait for app to start
+            self._wait_for_messages_app(running=True)
             
         # Test when Messages app is running but busy
         try:
-            # Send a message while simultaneously doing something in Messages
-            subprocess.Popen(
-                ['osascript', '-e', 'tell application "Messages" to get every chat'],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
+            # Send a message while simultaneously doing something in Messages;
+            # a second sender runs the query in its own osascript process
+            busy_sender = MessageSender()
+            busy = threading.Thread(
+                target=busy_sender._run_script,
+                args=('tell application "Messages" to get every chat',)
             )
+            busy.start()
+            self.addCleanup(busy_sender.close)
+            self.addCleanup(busy.join)
             
             # Try to send a message immediately
             success = self.sender.send_message(
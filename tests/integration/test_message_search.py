@@ -6,6 +6,7 @@ Tests search by content, sender, date range, and pagination.
 import logging
 import sys
 import os
+import sqlite3
 from datetime import datetime, timedelta
 from pathlib import Path
 import unittest
@@ -15,6 +16,9 @@ project_root = Path(__file__).parent.parent.parent
 sys.path.append(str(project_root))
 
 from src.messaging.message_reader import MessageReader, MessageReadError
+from src.messaging.message_index import MessageIndex
+from tests.fixtures.chat_sample import build_chat_sample
+from tests.fixtures.tmpdir import fast_tmpdir
 
 # Configure logging
 logging.basicConfig(
@@ -24,6 +28,14 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 class TestMessageSearch(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        """Compute the dates used by the date-range tests once per run."""
+        cls.today = datetime.now()
+        cls.today_str = cls.today.strftime("%Y-%m-%d")
+        cls.week_ago_str = (cls.today - timedelta(days=7)).strftime("%Y-%m-%d")
+        cls.month_ago_str = (cls.today - timedelta(days=30)).strftime("%Y-%m-%d")
+        
     def setUp(self):
         """Set up test environment before each test."""
         self.reader = MessageReader()
@@ -63,8 +75,8 @@ class TestMessageSearch(unittest.TestCase):
     def test_03_search_by_date_range(self):
         """Test searching messages within a date range."""
         # Search for messages from the last 7 days
-        end_date = datetime.now().strftime("%Y-%m-%d")
-        start_date = (datetime.now() - timedelta(days=7)).strftime("%Y-%m-%d")
+        end_date = self.today_str
+        start_date = self.week_ago_str
         
         results = self.reader.search_messages(
             start_date=start_date,
@@ -76,9 +88,9 @@ class TestMessageSearch(unittest.TestCase):
         
         # Verify message dates are within range
         for msg in results.messages:
-            msg_date = datetime.strptime(msg['timestamp'].split()[0], "%Y-%m-%d")
-            self.assertGreaterEqual(msg_date, datetime.strptime(start_date, "%Y-%m-%d"))
-            self.assertLessEqual(msg_date, datetime.strptime(end_date, "%Y-%m-%d"))
+            msg_date = msg['timestamp'][:10]
+            self.assertGreaterEqual(msg_date, start_date)
+            self.assertLessEqual(msg_date, end_date)
             
     def test_04_pagination(self):
         """Test message search pagination."""
@@ -89,8 +101,11 @@ class TestMessageSearch(unittest.TestCase):
         self.assertEqual(len(page1.messages), min(page_size, page1.total_count))
         
         if page1.has_next_page():
-            # Get second page
-            page2 = self.reader.search_messages(page=2, page_size=page_size)
+            # Get second page by seeking past the last message of the first
+            page2 = self.reader.search_messages(
+                after_cursor=page1.next_cursor,
+                page_size=page_size
+            )
             self.assertNotEqual(
                 page1.messages[0]['timestamp'],
                 page2.messages[0]['timestamp'],
@@ -105,8 +120,8 @@ class TestMessageSearch(unittest.TestCase):
     def test_05_combined_search(self):
         """Test searching with multiple criteria."""
         # Search for test messages from our test number in the last 30 days
-        end_date = datetime.now().strftime("%Y-%m-%d")
-        start_date = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d")
+        end_date = self.today_str
+        start_date = self.month_ago_str
         
         results = self.reader.search_messages(
             content="test",
@@ -128,9 +143,54 @@ class TestMessageSearch(unittest.TestCase):
                 msg['is_from_me'] or self.test_number in msg['sender'],
                 f"Message from unexpected sender: {msg['sender']}"
             )
-            msg_date = datetime.strptime(msg['timestamp'].split()[0], "%Y-%m-%d")
-            self.assertGreaterEqual(msg_date, datetime.strptime(start_date, "%Y-%m-%d"))
-            self.assertLessEqual(msg_date, datetime.strptime(end_date, "%Y-%m-%d"))
+            msg_date = msg['timestamp'][:10]
+            self.assertGreaterEqual(msg_date, start_date)
+            self.assertLessEqual(msg_date, end_date)
+            
+    def test_06_count_cache_bounded(self):
+        """Test that cached search counts are bounded."""
+        self.reader.COUNT_CACHE_SIZE = 2
+        for content in ("test", "hello", "meeting"):
+            self.reader.search_messages(content=content, page_size=1)
+        self.assertEqual(len(self.reader._count_cache), 2)
+        
+        # The newest counts are kept
+        cached_content = [key[0] for key in self.reader._count_cache]
+        self.assertEqual(cached_content, ["hello", "meeting"])
+        
+    def test_07_cursor_splits_message_attachments(self):
+        """Test that a cursor inside a multi-attachment message keeps its other rows."""
+        temp_dir = fast_tmpdir()
+        self.addCleanup(temp_dir.cleanup)
+        db_path = build_chat_sample(str(Path(temp_dir.name) / 'chat.db'))
+        self.addCleanup(lambda: Path(MessageIndex.default_path(db_path)).unlink(missing_ok=True))
+        
+        # Give the newest attachment message a second attachment
+        reader = MessageReader(db_path)
+        self.addCleanup(reader.close)
+        newest = reader.search_messages(has_attachments=True, page_size=1)
+        conn = sqlite3.connect(db_path)
+        attachment_id = conn.execute(
+            "INSERT INTO attachment (guid, filename, mime_type) VALUES ('extra', 'extra.jpeg', 'image/jpeg')"
+        ).lastrowid
+        conn.execute(
+            "INSERT INTO message_attachment_join VALUES (?, ?)",
+            (newest.messages[0]['rowid'], attachment_id)
+        )
+        conn.commit()
+        conn.close()
+        
+        # End the first page between the message's two rows
+        first = reader.search_messages(has_attachments=True, page_size=1)
+        rest = reader.search_messages(
+            has_attachments=True, after_cursor=first.next_cursor, page_size=5
+        )
+        by_offset = reader.search_messages(has_attachments=True, page_size=6)
+        self.assertEqual(
+            [(m['rowid'], m['attachment']['filename']) for m in first.messages + rest.messages],
+            [(m['rowid'], m['attachment']['filename']) for m in by_offset.messages]
+        )
+        self.assertEqual(rest.messages[0]['rowid'], first.messages[0]['rowid'])
 
 def run_tests(test_names=None):
     """Run tests, optionally filtering to specific test names."""
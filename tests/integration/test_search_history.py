@@ -101,6 +101,17 @@ class TestSearchHistory(unittest.TestCase):
         recent = self.history.get_recent_searches()
         self.assertEqual(len(recent), 0)
         
+    def test_06_reload_history(self):
+        """Test that a new instance reloads the retained searches from disk."""
+        for i in range(110):
+            self.history.add_search(content=f"test {i}", result_count=i)
+            
+        reloaded = SearchHistory(self.history_file)
+        recent = reloaded.get_recent_searches(limit=200)
+        self.assertEqual(len(recent), 100)
+        self.assertEqual(recent[0]['criteria']['content'], "test 109")
+        self.assertEqual(recent[-1]['criteria']['content'], "test 10")
+        
     def test_05_integration_with_message_reader(self):
         """Test search history integration with MessageReader."""
         # Create a MessageReader with our test history file
@@ -4,10 +4,13 @@ Tests for the DatabaseConnector class.
 
 import os
 import sqlite3
+import threading
 import pytest
 from pathlib import Path
 from unittest.mock import patch, MagicMock
-from src.database.db_connector import DatabaseConnector, DatabaseError, PermissionError
+from src.database.db_connector import (
+    DatabaseConnector, DatabaseError, PermissionError, watch_chat_db
+)
 
 # Test data
 MOCK_MESSAGES = [
@@ -39,12 +42,8 @@ MOCK_CONTACT = {
     'uncanonicalized_id': '+1 (234) 567-890'
 }
 
-@pytest.fixture
-def mock_db_path(tmp_path):
-    """Create a temporary database for testing."""
-    db_path = tmp_path / "test_chat.db"
-    conn = sqlite3.connect(str(db_path))
-    
+def _seed_database(conn):
+    """Create the test tables and rows on a database connection."""
     # Create test tables
     conn.execute("""
         CREATE TABLE message (
@@ -90,10 +89,34 @@ def mock_db_path(tmp_path):
     ))
     
     conn.commit()
+
+@pytest.fixture
+def mock_db_path(tmp_path):
+    """Create a temporary database file for tests that need one on disk."""
+    db_path = tmp_path / "test_chat.db"
+    conn = sqlite3.connect(str(db_path))
+    _seed_database(conn)
     conn.close()
     
     return str(db_path)
 
+@pytest.fixture(scope="module")
+def shared_db():
+    """Seed one in-memory database for the whole module."""
+    conn = sqlite3.connect("file:test_db_connector?mode=memory&cache=shared", uri=True)
+    _seed_database(conn)
+    yield DatabaseConnector(conn)
+    conn.close()
+
+@pytest.fixture
+def mock_db(shared_db):
+    """Give each test the shared database, rolling back anything it writes."""
+    conn = shared_db._shared_conn
+    conn.execute("SAVEPOINT test_case")
+    yield shared_db
+    conn.execute("ROLLBACK TO test_case")
+    conn.execute("RELEASE test_case")
+
 def test_init_with_invalid_path():
     """Test initialization with invalid database path."""
     with pytest.raises(DatabaseError):
@@ -108,9 +131,9 @@ def test_init_with_permission_error():
         with pytest.raises(PermissionError):
             DatabaseConnector()
 
-def test_get_recent_messages(mock_db_path):
+def test_get_recent_messages(mock_db):
     """Test retrieving recent messages."""
-    db = DatabaseConnector(mock_db_path)
+    db = mock_db
     messages = db.get_recent_messages(limit=1)
     
     assert len(messages) == 1
@@ -118,9 +141,9 @@ def test_get_recent_messages(mock_db_path):
     assert messages[0]['is_from_me'] == MOCK_MESSAGES[0]['is_from_me']
     assert messages[0]['service'] == MOCK_MESSAGES[0]['service']
 
-def test_get_contact_info(mock_db_path):
+def test_get_contact_info(mock_db):
     """Test retrieving contact information."""
-    db = DatabaseConnector(mock_db_path)
+    db = mock_db
     contact = db.get_contact_info(1)
     
     assert contact is not None
@@ -128,13 +151,49 @@ def test_get_contact_info(mock_db_path):
     assert contact['country'] == MOCK_CONTACT['country']
     assert contact['service'] == MOCK_CONTACT['service']
 
-def test_get_message_count(mock_db_path):
+def test_get_message_count(mock_db):
     """Test getting message count."""
-    db = DatabaseConnector(mock_db_path)
+    db = mock_db
     count = db.get_message_count()
     
     assert count == 1
 
+def test_in_memory_database():
+    """Test that in-memory databases skip the file existence check."""
+    db = DatabaseConnector(":memory:")
+    assert db.execute_query("SELECT 1 AS one") == [{'one': 1}]
+    db.close()
+
+@pytest.mark.parametrize("db_path", [":memory:", "file::memory:?cache=shared"])
+def test_in_memory_database_shared_across_threads(db_path):
+    """Test that every thread and reopen sees the same in-memory data."""
+    db = DatabaseConnector(db_path)
+    db.execute_query("CREATE TABLE t (x INTEGER)")
+    db.execute_query("INSERT INTO t VALUES (1)")
+    
+    results = []
+    worker = threading.Thread(
+        target=lambda: results.append(db.execute_query("SELECT x FROM t"))
+    )
+    worker.start()
+    worker.join()
+    assert results == [[{'x': 1}]]
+    
+    # close() keeps the data
+    db.close()
+    assert db.execute_query("SELECT x FROM t") == [{'x': 1}]
+    db._shared_conn.close()
+
+def test_shared_connection_isolation(mock_db):
+    """Test that writes on the shared connection are rolled back per test."""
+    with mock_db.get_connection() as conn:
+        conn.execute("INSERT INTO message (text) VALUES ('scratch')")
+    assert mock_db.get_message_count() == 2
+    
+    # close() leaves a caller-owned connection open
+    mock_db.close()
+    assert mock_db.get_message_count() == 2
+
 def test_connection_error_handling():
     """Test handling of connection errors."""
     with pytest.raises(DatabaseError) as exc_info:
@@ -147,9 +206,55 @@ def test_get_connection_context_manager(mock_db_path):
     
     with db.get_connection() as conn:
         assert isinstance(conn, sqlite3.Connection)
-        # Connection should be open
+        # Connection should be open and tuned
         conn.cursor().execute("SELECT 1")
+        assert conn.execute("PRAGMA cache_size").fetchone()[0] == -65536
+        assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2
+    
+    # Connection should be reused by later calls
+    with db.get_connection() as reused:
+        assert reused is conn
     
     # Connection should be closed
+    db.close()
     with pytest.raises(sqlite3.ProgrammingError):
         conn.cursor().execute("SELECT 1")
+
+def test_execute_query_retries_transient_errors(mock_db_path):
+    """Test that a locked database is retried on a fresh connection."""
+    db = DatabaseConnector(mock_db_path)
+    locked = MagicMock()
+    locked.cursor.return_value.execute.side_effect = sqlite3.OperationalError(
+        "database is locked"
+    )
+    locked.in_transaction = False
+    
+    with patch.object(db, '_connect', side_effect=[locked, db._connect()]), \
+            patch('src.database.db_connector.time.sleep') as mock_sleep:
+        rows = db.execute_query("SELECT COUNT(*) AS count FROM message")
+    
+    assert rows == [{'count': 1}]
+    locked.close.assert_called_once()
+    mock_sleep.assert_called_once_with(DatabaseConnector.RETRY_BACKOFF)
+    
+    # Non-transient errors are raised straight away
+    with pytest.raises(DatabaseError, match="no such table"):
+        db.execute_query("SELECT * FROM missing_table")
+
+def test_watch_chat_db(mock_db_path):
+    """Test that the watcher signals database writes."""
+    changed = threading.Event()
+    stop = watch_chat_db(mock_db_path, changed, poll_interval=0.01)
+    
+    try:
+        # Nothing written yet
+        assert not changed.wait(0.05)
+        
+        conn = sqlite3.connect(mock_db_path)
+        conn.execute("INSERT INTO message (text) VALUES ('new message')")
+        conn.commit()
+        conn.close()
+        
+        assert changed.wait(2)
+    finally:
+        stop.set()
@@ -2,10 +2,11 @@
 Tests for the MessageSender class.
 """
 
-import subprocess
 import pytest
+import subprocess
+import threading
 import time
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
 from src.messaging.message_sender import (
     MessageSender,
     RateLimit,
@@ -35,14 +36,16 @@ def test_message_escaping():
     )
     
     assert 'send "Message with \\"quotes\\" and other \\"special\\" characters"' in script
+    
+    # Backslashes are escaped too, so they cannot swallow a closing quote
+    script = sender._create_applescript("+1234567890", 'C:\\path\\')
+    assert 'send "C:\\\\path\\\\"' in script
 
 def test_rate_limiting():
     """Test rate limiting functionality."""
     sender = MessageSender(RateLimit(messages_per_minute=60, minimum_delay=0.1))
     
-    with patch('subprocess.run') as mock_run:
-        mock_run.return_value.returncode = 0
-        
+    with patch.object(MessageSender, '_run_script', return_value=[]) as mock_run:
         start_time = time.time()
         
         # Send three messages
@@ -59,9 +62,7 @@ def test_successful_send():
     """Test successful message sending."""
     sender = MessageSender()
     
-    with patch('subprocess.run') as mock_run:
-        mock_run.return_value.returncode = 0
-        
+    with patch.object(MessageSender, '_run_script', return_value=[]) as mock_run:
         result = sender.send_message("+1234567890", "Test message")
         
         assert result is True
@@ -71,40 +72,122 @@ def test_failed_send():
     """Test failed message sending."""
     sender = MessageSender()
     
-    with patch('subprocess.run') as mock_run:
-        mock_run.side_effect = subprocess.CalledProcessError(
-            1, 'cmd', stderr="Failed to send"
-        )
+    with patch.object(MessageSender, '_run_script') as mock_run:
+        mock_run.side_effect = SendError("Failed to send")
         
         with pytest.raises(SendError) as exc_info:
             sender.send_message("+1234567890", "Test message")
             
         assert "Failed to send message" in str(exc_info.value)
         
+def test_run_script_reuses_process():
+    """Test that scripts are piped to one persistent osascript process."""
+    sender = MessageSender()
+    
+    with patch('subprocess.Popen') as mock_popen:
+        proc = mock_popen.return_value
+        proc.poll.return_value = None
+        proc.stdout = iter([
+            '"ok"\n', f'"{MessageSender.SCRIPT_DONE}"\n',
+            f'"{MessageSender.SCRIPT_ERROR}Buddy not found"\n', f'"{MessageSender.SCRIPT_DONE}"\n'
+        ])
+        
+        assert sender._run_script('return "ok"') == ['ok']
+        with pytest.raises(SendError) as exc_info:
+            sender._run_script('error "Buddy not found"')
+            
+        assert "Buddy not found" in str(exc_info.value)
+        mock_popen.assert_called_once()
+        assert proc.stdin.write.call_count == 2
+        
+def test_run_script_times_out():
+    """Test that a silent osascript is killed instead of blocking forever."""
+    sender = MessageSender()
+    released = threading.Event()
+    
+    def hanging_stdout():
+        released.wait()
+        yield from ()
+        
+    with patch('subprocess.Popen') as mock_popen, \
+            patch.object(MessageSender, 'SCRIPT_READ_TIMEOUT', 0.05):
+        proc = mock_popen.return_value
+        proc.poll.return_value = None
+        proc.stdout = hanging_stdout()
+        
+        with pytest.raises(SendError, match="no output"):
+            sender._run_script('delay 60')
+            
+        proc.kill.assert_called_once()
+        assert sender._osa_proc is None
+    released.set()
+    
+def test_close_kills_unresponsive_process():
+    """Test that close() kills an osascript process that won't exit."""
+    sender = MessageSender()
+    
+    with patch('subprocess.Popen') as mock_popen:
+        proc = mock_popen.return_value
+        proc.poll.return_value = None
+        proc.stdout = iter([f'"{MessageSender.SCRIPT_DONE}"\n'])
+        proc.wait.side_effect = subprocess.TimeoutExpired('osascript', 5)
+        sender._run_script('return')
+        
+        sender.close()
+        
+    proc.kill.assert_called_once()
+    assert sender._osa_proc is None
+    assert sender._osa_lines is None
+    
+def test_bulk_send_parses_osascript_output():
+    """Test the bulk parser on raw osascript output, as _run_script reads it."""
+    sender = MessageSender()
+    
+    with patch('subprocess.Popen') as mock_popen, \
+            patch.object(MessageSender, '_enforce_rate_limit'):
+        proc = mock_popen.return_value
+        proc.poll.return_value = None
+        # Log statements are printed bare, the marker result in quotes
+        proc.stdout = iter([
+            "+1234567890:ok\n",
+            "+0987654321:error:Can't get buddy\n",
+            f'"{MessageSender.SCRIPT_DONE}"\n'
+        ])
+        
+        results = sender.send_bulk_messages(
+            ["+1234567890", "+0987654321"], "Test message", continue_on_error=True
+        )
+        
+    assert results == {"+1234567890": True, "+0987654321": False}
+    
 def test_bulk_send_success():
     """Test successful bulk message sending."""
     sender = MessageSender()
     recipients = ["+1234567890", "+0987654321"]
     
-    with patch('subprocess.run') as mock_run:
-        mock_run.return_value.returncode = 0
+    with patch.object(MessageSender, '_run_script') as mock_run:
+        mock_run.return_value = ["+1234567890:ok", "+0987654321:ok"]
         
         results = sender.send_bulk_messages(recipients, "Test message")
         
         assert all(results.values())
-        assert mock_run.call_count == len(recipients)
+        # Every recipient is sent to from one script
+        mock_run.assert_called_once()
+        script = mock_run.call_args[0][0]
+        assert '{"+1234567890", "+0987654321"}' in script
+        assert f"delay {sender.rate_limit.minimum_delay}" in script
         
 def test_bulk_send_partial_failure():
     """Test bulk sending with some failures."""
     sender = MessageSender()
     recipients = ["+1234567890", "+0987654321", "+1112223333"]
     
-    with patch('subprocess.run') as mock_run:
+    with patch.object(MessageSender, '_run_script') as mock_run:
         # Make every other send fail
-        mock_run.side_effect = [
-            MagicMock(returncode=0),
-            subprocess.CalledProcessError(1, 'cmd', stderr="Failed to send"),
-            MagicMock(returncode=0)
+        mock_run.return_value = [
+            "+1234567890:ok",
+            "+0987654321:error:Failed to send",
+            "+1112223333:ok"
         ]
         
         results = sender.send_bulk_messages(
@@ -116,16 +199,25 @@ def test_bulk_send_partial_failure():
         assert results[recipients[0]] is True
         assert results[recipients[1]] is False
         assert results[recipients[2]] is True
+        mock_run.assert_called_once()
         
 def test_bulk_send_stop_on_error():
     """Test bulk sending stopping on first error."""
     sender = MessageSender()
     recipients = ["+1234567890", "+0987654321", "+1112223333"]
     
-    with patch('subprocess.run') as mock_run:
-        mock_run.side_effect = subprocess.CalledProcessError(
-            1, 'cmd', stderr="Failed to send"
-        )
+    with patch.object(MessageSender, '_run_script') as mock_run:
+        mock_run.side_effect = SendError("Failed to send")
         
         with pytest.raises(SendError):
             sender.send_bulk_messages(recipients, "Test message")
+            
+    with patch.object(MessageSender, '_run_script') as mock_run:
+        # The script stops at the first failed send
+        mock_run.return_value = ["+1234567890:ok", "+0987654321:error:Failed to send"]
+        
+        with pytest.raises(SendError) as exc_info:
+            sender.send_bulk_messages(recipients, "Test message")
+            
+        assert "+0987654321" in str(exc_info.value)
+        assert "exit repeat" in mock_run.call_args[0][0]
@@ -0,0 +1,49 @@
+"""
+Unit tests for the API's server-sent event streaming.
+"""
+
+import unittest
+from unittest.mock import patch
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.append(str(project_root))
+
+from src.web import api
+from src.web.api import buffered_sse_frames
+
+class TestBufferedSseFrames(unittest.TestCase):
+    def test_flushes(self):
+        """Test flushing on size, on interval and at the end of the stream."""
+        deltas = ["hello ", "world!!", "a", "b"]
+        # Start, "hello " check, reset after the size flush, "a" check,
+        # reset after the interval flush, "b" check
+        clock = [0.0, 0.1, 0.2, 1.5, 1.5, 1.6]
+        
+        with patch.object(api.time, 'monotonic', side_effect=clock):
+            frames = list(buffered_sse_frames(deltas, flush_interval=1.0, flush_bytes=10))
+            
+        self.assertEqual(frames, [
+            'data: {"delta":"hello world!!"}\n\n',  # flush_bytes reached
+            'data: {"delta":"a"}\n\n',  # flush_interval passed
+            'data: {"delta":"b"}\n\n',  # final flush
+            'event: stream_end\ndata: {}\n\n'
+        ])
+        
+    def test_error_event(self):
+        """Test that an error while streaming ends with an error event."""
+        def deltas():
+            yield "partial"
+            raise RuntimeError("upstream closed")
+            
+        frames = list(buffered_sse_frames(deltas(), flush_interval=60.0))
+        
+        self.assertEqual(frames, [
+            'data: {"delta":"partial"}\n\n',
+            'event: error\ndata: {"detail":"upstream closed"}\n\n'
+        ])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -137,6 +137,15 @@ class TestContact(unittest.TestCase):
             "Messages: 0 (0 unread)"
         )
         self.assertEqual(str(self.contact), expected)
+        
+        # The string follows changes made directly or via methods
+        self.contact.name = "Jane Doe"
+        self.contact.add_email("jane@example.com")
+        self.contact.update_message_stats(total_delta=2, unread_delta=1)
+        self.assertEqual(str(self.contact), expected
+            .replace("John Doe", "Jane Doe")
+            .replace("john@example.com", "john@example.com, jane@example.com")
+            .replace("0 (0 unread)", "2 (1 unread)"))
 
 def run_tests():
     """Run the test suite."""
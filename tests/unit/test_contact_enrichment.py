@@ -3,38 +3,40 @@ import unittest
 from unittest.mock import Mock, patch
 from datetime import datetime
 
-from openai.types.chat import ChatCompletion, ChatCompletionMessage
-from openai.types.chat.chat_completion import Choice
-
 from src.contacts.contact_enrichment import ContactEnrichmentManager
-from src.contacts.contact_manager import ContactManager
-from src.messaging import MessageSender
 from src.database.chat_state import ChatStateManager
 from config.openai_config import OpenAIConfig
 
+# Fixed timestamps keep the tests deterministic
+_FIXED_TS = datetime(2024, 1, 1, 12, 0, 0)
+_FIXED_ISO = _FIXED_TS.isoformat()
+
+class _StubMessageSender:
+    """Stands in for MessageSender, which generating a request never touches."""
+
 class TestContactEnrichmentManager(unittest.TestCase):
     """Test cases for ContactEnrichmentManager."""
     
-    def setUp(self):
-        """Set up test fixtures."""
-        self.contact_manager = Mock(spec=ContactManager)
-        self.message_sender = Mock(spec=MessageSender)
-        self.state_manager = Mock()
-        self.state_manager.get_chat_info = Mock()
-        self.state_manager.record_enrichment_request = Mock()
-        self.openai_client = Mock()
+    @classmethod
+    def setUpClass(cls):
+        """Create the OpenAI client mock and its response once; tests reset it instead."""
+        # Imported here so collecting this module doesn't load the OpenAI SDK
+        from openai.types.chat import ChatCompletion, ChatCompletionMessage
+        from openai.types.chat.chat_completion import Choice
         
-        # Mock the OpenAI response
-        self.mock_completion = ChatCompletion(
+        cls.openai_client = Mock()
+        
+        # Mock the OpenAI response; the fields are fixed, so skip validation
+        cls._MOCK_COMPLETION = ChatCompletion.model_construct(
             id="test_completion",
             model="gpt-4",
             object="chat.completion",
-            created=int(datetime.now().timestamp()),
+            created=int(_FIXED_TS.timestamp()),
             choices=[
-                Choice(
+                Choice.model_construct(
                     finish_reason="stop",
                     index=0,
-                    message=ChatCompletionMessage(
+                    message=ChatCompletionMessage.model_construct(
                         content="Welcome! Could you please share your name and email?",
                         role="assistant"
                     )
@@ -42,28 +44,36 @@ class TestContactEnrichmentManager(unittest.TestCase):
             ]
         )
         
-        self.openai_client.chat.completions.create.return_value = self.mock_completion
+        # Test data, only read by the tests
+        cls.chat_guid = "test_chat_123"
+        cls.participants = {
+            "+1987654321": ["name", "email"],
+            "+1555555555": ["name"]
+        }
+        cls.chat_info = {
+            "display_name": "Test Project Team",
+            "participants": ["+1234567890", "+1987654321", "+1555555555"],
+            "created_at": _FIXED_ISO
+        }
+        
+    def setUp(self):
+        """Set up test fixtures."""
+        self.contacts_db = Mock()
+        self.message_sender = _StubMessageSender()
+        self.state_manager = Mock()
+        self.openai_client.reset_mock(side_effect=True)
+        
+        self.mock_completion = self._MOCK_COMPLETION
+        self.openai_client.chat.completions.create.return_value = self._MOCK_COMPLETION
         
         self.enrichment_manager = ContactEnrichmentManager(
-            contact_manager=self.contact_manager,
+            contacts_db=self.contacts_db,
             message_sender=self.message_sender,
             state_manager=self.state_manager,
             system_phone="+1234567890",
             openai_client=self.openai_client
         )
         
-        # Test data
-        self.chat_guid = "test_chat_123"
-        self.participants = {
-            "+1987654321": ["name", "email"],
-            "+1555555555": ["name"]
-        }
-        self.chat_info = {
-            "display_name": "Test Project Team",
-            "participants": ["+1234567890", "+1987654321", "+1555555555"],
-            "created_at": datetime.now().isoformat()
-        }
-        
         # Setup state manager mock
         self.state_manager.get_chat_info.return_value = self.chat_info
         
@@ -100,12 +110,13 @@ class TestContactEnrichmentManager(unittest.TestCase):
         # Make OpenAI call fail
         self.openai_client.chat.completions.create.side_effect = Exception("API Error")
         
-        # Verify error is propagated
-        with self.assertRaises(Exception):
+        # Verify the OpenAI error itself is propagated, before anything is tracked
+        with self.assertRaisesRegex(Exception, "API Error"):
             self.enrichment_manager.generate_enrichment_request(
                 self.chat_guid,
                 self.participants
             )
+        self.contacts_db.find_by_identifier.assert_not_called()
             
     def test_generate_enrichment_request_state_error(self):
         """Test handling of state manager errors."""
@@ -134,14 +145,16 @@ class TestContactEnrichmentManager(unittest.TestCase):
             expected_calls
         )
         
-        # Verify tracking data
-        for phone, fields in self.participants.items():
-            self.state_manager.record_enrichment_request.assert_any_call(
-                chat_guid=self.chat_guid,
-                phone_number=phone,
-                requested_fields=fields,
-                timestamp=unittest.mock.ANY  # We can't predict the exact timestamp
-            )
+        # Verify tracking data; the timestamp can't be predicted
+        actual = {
+            (c.kwargs["chat_guid"], c.kwargs["phone_number"], tuple(c.kwargs["requested_fields"]))
+            for c in self.state_manager.record_enrichment_request.call_args_list
+        }
+        expected = {
+            (self.chat_guid, phone, tuple(fields))
+            for phone, fields in self.participants.items()
+        }
+        self.assertEqual(actual, expected)
             
 if __name__ == '__main__':
     unittest.main()
@@ -2,17 +2,18 @@
 Unit tests for ContactManager class.
 """
 
+import os
 import unittest
-import tempfile
-import shutil
+import copy
 import json
 from datetime import datetime
 import sys
 from pathlib import Path
 
 # Add project root to Python path
-project_root = Path(__file__).parent.parent.parent
-sys.path.append(str(project_root))
+project_root = str(Path(__file__).parent.parent.parent)
+if project_root not in sys.path:
+    sys.path.append(project_root)
 
 from src.contacts.contact import Contact
 from src.contacts.contact_manager import (
@@ -20,29 +21,53 @@ from src.contacts.contact_manager import (
     ContactManagerError,
     ContactNotFoundError
 )
+from tests.fixtures.tmpdir import fast_tmpdir
+
+# Fixed timestamps keep the tests deterministic
+_FIXED_TS = datetime(2024, 1, 1, 12, 0, 0)
+_FIXED_ISO = _FIXED_TS.isoformat()
+
+# (identifier, expected contact name or None) for find_by_identifier
+_FIND_CASES = (
+    ("1234567890", "John Doe"),
+    ("+11234567890", "John Doe"),
+    ("john@example.com", "John Doe"),
+    ("nonexistent", None),
+)
+
+def _wipe_dir(path):
+    """Remove every file in a directory, leaving the directory itself."""
+    with os.scandir(path) as entries:
+        for entry in entries:
+            os.unlink(entry.path)
 
 class TestContactManager(unittest.TestCase):
-    def setUp(self):
-        """Set up test fixtures."""
+    @classmethod
+    def setUpClass(cls):
+        """Set up fixtures shared by all tests."""
         # Create a temporary directory for contact storage
-        self.temp_dir = tempfile.mkdtemp()
-        self.manager = ContactManager(self.temp_dir)
+        temp_dir = fast_tmpdir()
+        cls.addClassCleanup(temp_dir.cleanup)
+        cls.temp_dir = temp_dir.name
         
-        # Create some test contacts
-        self.contact1 = Contact(
+        # Create some test contacts; tests get copies they can modify
+        cls.contact1_template = Contact(
             name="John Doe",
             phone_numbers=["+11234567890"],
             emails=["john@example.com"]
         )
-        self.contact2 = Contact(
+        cls.contact2_template = Contact(
             name="Jane Smith",
             phone_numbers=["+19876543210"],
             emails=["jane@example.com"]
         )
         
-    def tearDown(self):
-        """Clean up after tests."""
-        shutil.rmtree(self.temp_dir)
+    def setUp(self):
+        """Give each test an empty store and fresh contacts."""
+        _wipe_dir(self.temp_dir)
+        self.manager = ContactManager(self.temp_dir)
+        self.contact1 = copy.deepcopy(self.contact1_template)
+        self.contact2 = copy.deepcopy(self.contact2_template)
         
     def test_add_contact(self):
         """Test adding contacts."""
@@ -57,17 +82,23 @@ class TestContactManager(unittest.TestCase):
         with self.assertRaises(ContactManagerError):
             self.manager.add_contact(self.contact1)
             
-    def test_get_contact(self):
-        """Test retrieving contacts."""
-        self.manager.add_contact(self.contact1)
+    def test_add_contacts(self):
+        """Test adding several contacts at once."""
+        self.manager.add_contacts([self.contact1, self.contact2])
+        self.assertEqual(len(self.manager.contacts), 2)
         
-        # Get existing contact
-        contact = self.manager.get_contact(self.contact1.contact_id)
-        self.assertEqual(contact.name, "John Doe")
+        # Verify both contacts were saved to disk
+        new_manager = ContactManager(self.temp_dir)
+        self.assertEqual(
+            set(new_manager.contacts),
+            {self.contact1.contact_id, self.contact2.contact_id}
+        )
         
-        # Try getting non-existent contact
-        with self.assertRaises(ContactNotFoundError):
-            self.manager.get_contact("nonexistent")
+        # Nothing is added if any contact already exists
+        contact3 = Contact(name="Bob Jones", phone_numbers=["+15555555555"])
+        with self.assertRaises(ContactManagerError):
+            self.manager.add_contacts([contact3, self.contact1])
+        self.assertNotIn(contact3.contact_id, self.manager.contacts)
             
     def test_update_contact(self):
         """Test updating contacts."""
@@ -101,21 +132,34 @@ class TestContactManager(unittest.TestCase):
         with self.assertRaises(ContactNotFoundError):
             self.manager.delete_contact("nonexistent")
             
-    def test_find_by_identifier(self):
-        """Test finding contacts by identifier."""
+    def test_find_by_identifier_after_changes(self):
+        """Test that identifier lookups follow updates and deletes."""
         self.manager.add_contact(self.contact1)
+        self.assertEqual(self.manager.find_by_identifier("JOHN@example.com"), self.contact1)
         
-        # Find by phone
-        contact = self.manager.find_by_identifier("1234567890")
-        self.assertEqual(contact.name, "John Doe")
+        # A changed phone number is found once the contact is updated
+        self.contact1.phone_numbers = ["+15555555555"]
+        self.manager.update_contact(self.contact1)
+        self.assertEqual(self.manager.find_by_identifier("555-555-5555"), self.contact1)
+        self.assertIsNone(self.manager.find_by_identifier("1234567890"))
         
-        # Find by email
-        contact = self.manager.find_by_identifier("john@example.com")
-        self.assertEqual(contact.name, "John Doe")
+        # Contacts added later are indexed too
+        self.manager.add_contact(self.contact2)
+        self.assertEqual(self.manager.find_by_identifier("9876543210"), self.contact2)
+        
+        self.manager.delete_contact(self.contact2.contact_id)
+        self.assertIsNone(self.manager.find_by_identifier("9876543210"))
         
-        # Try finding non-existent contact
-        contact = self.manager.find_by_identifier("nonexistent")
-        self.assertIsNone(contact)
+    def test_find_by_identifier_after_in_place_edit(self):
+        """Test that identifiers added to a managed contact are found."""
+        self.manager.add_contacts([self.contact1, self.contact2])
+        self.assertIsNone(self.manager.find_by_identifier("5555555555"))
+        
+        # Edited without update_contact
+        self.contact1.add_phone_number("5555555555")
+        self.contact2.add_email("jane.smith@example.com")
+        self.assertEqual(self.manager.find_by_identifier("+15555555555"), self.contact1)
+        self.assertEqual(self.manager.find_by_identifier("Jane.Smith@example.com"), self.contact2)
         
     def test_search_contacts(self):
         """Test searching contacts."""
@@ -180,7 +224,7 @@ class TestContactManager(unittest.TestCase):
         self.manager.add_contact(self.contact1)
         
         # Update stats
-        now = datetime.now().isoformat()
+        now = _FIXED_ISO
         self.manager.update_message_stats(
             identifier="1234567890",
             total_delta=5,
@@ -201,6 +245,37 @@ class TestContactManager(unittest.TestCase):
                 total_delta=1
             )
             
+    def test_bulk_update_message_stats(self):
+        """Test updating message statistics for several contacts at once."""
+        self.manager.add_contact(self.contact1)
+        self.manager.add_contact(self.contact2)
+        
+        now = _FIXED_ISO
+        self.manager.bulk_update_message_stats([
+            {'identifier': "1234567890", 'total_delta': 5, 'unread_delta': 3,
+             'last_message_time': now},
+            {'identifier': "jane@example.com", 'unread_delta': 2,
+             'metadata': {'unread_topics': 'lunch'}}
+        ])
+        
+        # Verify updates were persisted
+        new_manager = ContactManager(self.temp_dir)
+        john = new_manager.get_contact(self.contact1.contact_id)
+        jane = new_manager.get_contact(self.contact2.contact_id)
+        self.assertEqual(john.total_messages, 5)
+        self.assertEqual(john.unread_messages, 3)
+        self.assertEqual(john.last_message_at, now)
+        self.assertEqual(jane.unread_messages, 2)
+        self.assertEqual(jane.get_metadata('unread_topics'), 'lunch')
+        
+        # Nothing is updated if any identifier is unknown
+        with self.assertRaises(ContactNotFoundError):
+            self.manager.bulk_update_message_stats([
+                {'identifier': "1234567890", 'total_delta': 1},
+                {'identifier': "nonexistent", 'total_delta': 1}
+            ])
+        self.assertEqual(self.manager.get_contact(self.contact1.contact_id).total_messages, 5)
+            
     def test_persistence(self):
         """Test contact persistence across manager instances."""
         # Add contacts
@@ -215,6 +290,66 @@ class TestContactManager(unittest.TestCase):
         self.assertIn(self.contact1.contact_id, new_manager.contacts)
         self.assertIn(self.contact2.contact_id, new_manager.contacts)
 
+class TestContactManagerLookups(unittest.TestCase):
+    """Read-only lookups, sharing one manager populated once."""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Populate a manager with the test contacts."""
+        temp_dir = fast_tmpdir()
+        cls.addClassCleanup(temp_dir.cleanup)
+        cls.temp_dir = temp_dir.name
+        cls.manager = ContactManager(cls.temp_dir)
+        cls.contact1 = Contact(
+            name="John Doe",
+            phone_numbers=["+11234567890"],
+            emails=["john@example.com"]
+        )
+        cls.contact2 = Contact(
+            name="Jane Smith",
+            phone_numbers=["+19876543210"],
+            emails=["jane@example.com"]
+        )
+        cls.manager.add_contacts([cls.contact1, cls.contact2])
+        
+    def test_get_contact(self):
+        """Test retrieving contacts."""
+        # Get existing contact
+        contact = self.manager.get_contact(self.contact1.contact_id)
+        self.assertEqual(contact.name, "John Doe")
+        
+        # Try getting non-existent contact
+        with self.assertRaises(ContactNotFoundError):
+            self.manager.get_contact("nonexistent")
+            
+    def test_find_by_identifier(self):
+        """Test finding contacts by phone, email, or an unknown identifier."""
+        for identifier, expected_name in _FIND_CASES:
+            with self.subTest(identifier=identifier):
+                contact = self.manager.find_by_identifier(identifier)
+                self.assertEqual(contact and contact.name, expected_name)
+                
+    def test_get_contacts_bulk(self):
+        """Test looking up several phone numbers at once."""
+        results = self.manager.get_contacts_bulk(
+            ["1234567890", "+19876543210", "5555555555"]
+        )
+        
+        self.assertEqual(set(results), {"1234567890", "+19876543210"})
+        self.assertEqual(results["1234567890"].name, "John Doe")
+        self.assertEqual(results["+19876543210"].name, "Jane Smith")
+        self.assertEqual(self.manager.get_contacts_bulk([]), {})
+        
+    def test_find_by_identifiers(self):
+        """Test looking up a mix of phone numbers and emails at once."""
+        results = self.manager.find_by_identifiers(
+            ["+11234567890", "JANE@EXAMPLE.COM", "nobody@example.com"]
+        )
+        
+        self.assertEqual(set(results), {"+11234567890", "JANE@EXAMPLE.COM"})
+        self.assertEqual(results["+11234567890"].name, "John Doe")
+        self.assertEqual(results["JANE@EXAMPLE.COM"].name, "Jane Smith")
+
 def run_tests():
     """Run the test suite."""
     unittest.main()
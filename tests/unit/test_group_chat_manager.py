@@ -16,7 +16,6 @@ import json
 from datetime import datetime
 from pathlib import Path
 import tempfile
-import shutil
 
 from src.messaging.group_chat_manager import GroupChatManager
 from src.database.db_connector import DatabaseConnector
@@ -25,41 +24,51 @@ from src.contacts.contact_manager import ContactManager
 from src.messaging import MessageSender
 
 class TestGroupChatManager(unittest.TestCase):
-    def setUp(self):
-        """Set up test fixtures."""
-        self.temp_dir = tempfile.mkdtemp()
-        self.storage_path = Path(self.temp_dir) / '.imessage_crm'
-        
-        # Mock dependencies
-        self.db_connector = Mock(spec=DatabaseConnector)
-        self.db_connector.execute_query = Mock(return_value=[])
+    @classmethod
+    def setUpClass(cls):
+        """Create the mocked dependencies once; tests reset them instead."""
+        cls.db_connector = Mock(spec=DatabaseConnector)
+        cls.contact_manager = Mock(spec=ContactManager)
+        # GroupChatManager calls find_by_phone, which ContactManager's spec lacks
+        cls.contact_manager.find_by_phone = Mock()
+        cls.message_sender = Mock(spec=MessageSender)
         
-        self.contact_manager = Mock(spec=ContactManager)
-        self.contact_manager.find_by_phone = Mock(return_value=None)
-        self.contact_manager.add_contact = Mock()
-        self.contact_manager.update_contact = Mock()
+        # System phone number for testing
+        cls.system_phone = "+16096077685"
         
-        self.message_sender = Mock(spec=MessageSender)
-        self.message_sender.send_message = Mock()
+        # One home directory for the class, emptied between tests
+        temp_dir = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(temp_dir.cleanup)
+        cls.temp_dir = temp_dir.name
+        cls.storage_path = Path(cls.temp_dir) / '.imessage_crm'
+        cls.storage_path.mkdir(parents=True)
+        home_patch = patch.object(Path, 'home', return_value=Path(cls.temp_dir))
+        home_patch.start()
+        cls.addClassCleanup(home_patch.stop)
         
-        # System phone number for testing
-        self.system_phone = "+16096077685"
+    def setUp(self):
+        """Set up test fixtures."""
+        # Remove state saved by earlier tests, keeping the directories
+        for path in self.storage_path.iterdir():
+            if path.is_dir():
+                for child in path.iterdir():
+                    child.unlink()
+            else:
+                path.unlink()
         
-        # Create storage directory
-        self.storage_path.mkdir(parents=True)
+        # Clear calls, results and errors configured by earlier tests
+        for mock in (self.db_connector, self.contact_manager, self.message_sender):
+            mock.reset_mock(return_value=True, side_effect=True)
+        self.db_connector.execute_query.return_value = []
+        self.contact_manager.find_by_phone.return_value = None
         
         # Initialize manager with mocked dependencies
-        with patch('pathlib.Path.home', return_value=Path(self.temp_dir)):
-            self.manager = GroupChatManager(
-                self.db_connector,
-                self.contact_manager,
-                self.message_sender,
-                self.system_phone
-            )
-    
-    def tearDown(self):
-        """Clean up after tests."""
-        shutil.rmtree(self.temp_dir)
+        self.manager = GroupChatManager(
+            self.db_connector,
+            self.contact_manager,
+            self.message_sender,
+            self.system_phone
+        )
     
     def test_check_new_group_chats_empty(self):
         """Test checking for new chats when none exist."""
@@ -93,6 +102,62 @@ class TestGroupChatManager(unittest.TestCase):
         self.assertEqual(len(result[0]['participants']), 3)
         self.assertIn(self.system_phone, result[0]['participants'])
     
+    def test_check_new_group_chats_incremental(self):
+        """Test that scans resume after the last processed chat ROWID."""
+        def make_chat(chat_id):
+            return {
+                'chat_id': chat_id,
+                'guid': f'chat{chat_id}',
+                'display_name': None,
+                'participant_numbers': f'{self.system_phone},+19995551234',
+                'last_message_id': chat_id,
+                'last_message_date': 0,
+                'last_message_text': 'Hi',
+                'last_message_is_from_me': 1
+            }
+        
+        # Chat 5 is already processed, chat 7 is new
+        self.manager.state.record_new_chat(
+            {'chat_id': 5, 'guid': 'chat5', 'participants': [self.system_phone]}
+        )
+        self.db_connector.execute_query.return_value = [make_chat(7), make_chat(5)]
+        
+        result = self.manager.check_new_group_chats()
+        self.assertEqual([chat['chat_id'] for chat in result], [7])
+        self.assertEqual(self.manager.state.get_last_scanned_chat_rowid(), 5)
+        
+        # Once chat 7 is processed the next scan starts after it
+        self.manager.state.record_new_chat(
+            {'chat_id': 7, 'guid': 'chat7', 'participants': [self.system_phone]}
+        )
+        self.db_connector.execute_query.return_value = [make_chat(7)]
+        self.manager.check_new_group_chats()
+        self.assertEqual(self.db_connector.execute_query.call_args[0][1][0], 5)
+        self.assertEqual(self.manager.state.get_last_scanned_chat_rowid(), 7)
+    
+    def test_check_new_group_chats_skips_rejected_chats(self):
+        """Test that the scan mark advances past chats the scan rejects."""
+        def make_chat(chat_id, is_from_me, date):
+            return {
+                'chat_id': chat_id,
+                'guid': f'chat{chat_id}',
+                'display_name': None,
+                'participant_numbers': f'{self.system_phone},+19995551234',
+                'last_message_id': chat_id,
+                'last_message_date': date,
+                'last_message_text': 'Hi',
+                'last_message_is_from_me': is_from_me
+            }
+        
+        # Chat 3 isn't ours and chat 4 has nothing since the last check
+        self.db_connector.execute_query.return_value = [
+            make_chat(3, 0, 200), make_chat(4, 1, 50), make_chat(6, 1, 200)
+        ]
+        
+        result = self.manager.check_new_group_chats(since_time=100)
+        self.assertEqual([chat['chat_id'] for chat in result], [6])
+        self.assertEqual(self.manager.state.get_last_scanned_chat_rowid(), 4)
+        
     def test_process_new_chat(self):
         """Test processing a new group chat."""
         # Test chat data
@@ -189,17 +254,14 @@ class TestGroupChatManager(unittest.TestCase):
         }
         
         # Save monitoring data
-        with patch('pathlib.Path.home', return_value=Path(self.temp_dir)):
-            self.manager._save_monitoring_data(chat_guid, monitoring_data)
+        self.manager._save_monitoring_data(chat_guid, monitoring_data)
         
         # Verify file was created
         storage_file = self.storage_path / 'chats' / f"{chat_guid}.json"
         self.assertTrue(storage_file.exists())
         
-        # Verify content
-        with open(storage_file, 'r') as f:
-            saved_data = json.load(f)
-        self.assertEqual(saved_data, monitoring_data)
+        # Verify content matches what the manager serializes
+        self.assertEqual(storage_file.read_text(), json.dumps(monitoring_data, indent=2))
     
     def test_error_handling(self):
         """Test error handling in main functions."""
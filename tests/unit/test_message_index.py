@@ -0,0 +1,65 @@
+"""
+Unit tests for the MessageIndex class.
+"""
+
+import unittest
+import sqlite3
+import tempfile
+import shutil
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.append(str(project_root))
+
+from src.messaging.message_index import MessageIndex
+
+class TestMessageIndex(unittest.TestCase):
+    def setUp(self):
+        """Set up a minimal chat.db and an empty index."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.chat_db = str(Path(self.temp_dir) / 'chat.db')
+        with sqlite3.connect(self.chat_db) as conn:
+            conn.execute("CREATE TABLE message (ROWID INTEGER PRIMARY KEY, text TEXT)")
+            conn.executemany(
+                "INSERT INTO message (ROWID, text) VALUES (?, ?)",
+                [(1, "Lunch tomorrow?"), (2, None), (3, "Running a TEST now")]
+            )
+        self.index = MessageIndex(self.chat_db, str(Path(self.temp_dir) / 'index.db'))
+    
+    def tearDown(self):
+        """Clean up after tests."""
+        shutil.rmtree(self.temp_dir)
+    
+    def _match(self, content):
+        """Return ROWIDs of chat.db messages matching content via the index."""
+        with sqlite3.connect(self.chat_db) as conn:
+            self.index.attach(conn)
+            rows = conn.execute(
+                f"SELECT ROWID FROM message WHERE ROWID IN "
+                f"(SELECT rowid FROM {MessageIndex.SCHEMA}.message_fts WHERE message_fts MATCH ?)",
+                (MessageIndex.match_expression(content),)
+            ).fetchall()
+        return [row[0] for row in rows]
+    
+    def test_refresh_is_incremental(self):
+        """Test that only messages added since the last refresh are indexed."""
+        self.assertEqual(self.index.refresh(), 2)
+        self.assertEqual(self.index.refresh(), 0)
+        
+        with sqlite3.connect(self.chat_db) as conn:
+            conn.execute("INSERT INTO message (ROWID, text) VALUES (4, 'test again')")
+        self.assertEqual(self.index.refresh(), 1)
+    
+    def test_substring_match(self):
+        """Test that matches behave like a case-insensitive substring search."""
+        self.index.refresh()
+        
+        self.assertEqual(self._match("test"), [3])
+        self.assertEqual(self._match("unch tom"), [1])
+        self.assertEqual(self._match('say "hi"'), [])
+        self.assertFalse(self.index.supports("hi"))
+
+if __name__ == '__main__':
+    unittest.main()